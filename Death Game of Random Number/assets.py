@@ -0,0 +1,281 @@
+import io
+import os
+import heapq
+import threading
+import pygame
+
+# -------------------------
+# Background Asset Loader
+# -------------------------
+SOUND = "sound"  # Short stinger, decoded into a pygame.mixer.Sound
+MUSIC = "music"  # Long track, kept compressed and streamed by pygame.mixer.music
+
+READY, PENDING, MISSING = "ready", "pending", "missing"
+
+# Channels reserved for each group of sounds, so a stinger never cuts off a UI sound
+# (or another stinger) just because pygame picked the same free channel. Music does not
+# take a channel: pygame.mixer.music streams it on its own.
+CHANNEL_GROUPS = (("stinger", 3), ("ui", 2))
+
+class Silence:
+    """Stands in for a Sound that is missing or not decoded yet."""
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def fadeout(self, ms):
+        pass
+
+    def set_volume(self, value):
+        pass
+
+    def get_length(self):
+        return 0.0
+
+SILENCE = Silence()
+
+def resident_bytes(asset):
+    # A decoded Sound holds length * rate sample frames; music holds its compressed file.
+    if isinstance(asset, bytes):
+        return len(asset)
+    mixer = pygame.mixer.get_init()
+    if asset is SILENCE or mixer is None:
+        return 0
+    frequency, size, channels = mixer
+    return round(asset.get_length() * frequency) * channels * abs(size) // 8
+
+class AssetManager:
+    """
+    Decodes sounds and reads music files on a worker thread so no scene waits on disk
+    or decode. Assets are queued by priority. enter_scene() moves the assets of that
+    scene and the scenes that can follow it to the front. Anything that is missing or
+    not loaded yet plays as silence instead of stopping the game.
+    The worker also opens the audio device first (if nobody has yet), so the first
+    frame never waits on the mixer. Music asked for before that is done is remembered
+    and started as soon as the mixer is open.
+    Everything loaded counts against `budget` bytes. Past it, the least recently used
+    assets are dropped. Those of the current scene are never dropped, and those of the
+    scenes that can follow it go last. A dropped asset goes back to pending and is
+    loaded again when a scene that uses it comes up.
+    """
+
+    def __init__(self, scene_assets, next_scenes, budget=24 * 1024 * 1024):
+        self.scene_assets = scene_assets  # scene -> [asset names]
+        self.next_scenes = next_scenes    # scene -> [scenes that can follow it]
+        self.budget = budget
+        self.paths = {}
+        self.kinds = {}
+        self.loaded = {}
+        self.state = {}
+        self.sizes = {}      # name -> resident bytes
+        self.resident = 0
+        self.last_used = {}  # name -> use counter, for least-recently-used eviction
+        self.uses = 0
+        self.evictions = 0
+        self.scene = None
+        self.scene_peaks = {}  # scene -> most audio memory resident while it was current
+        self.queue = []
+        self.order = 0
+        self.lock = threading.Condition()
+        self.thread = None
+        self.channels = {}   # group -> reserved pygame.mixer.Channels
+        self.audio = pygame.mixer.get_init() is not None
+        self.mixer_ready = False
+        self.music_wanted = None  # (name, loops) asked for before the mixer was open
+
+    def register(self, name, path, kind):
+        with self.lock:
+            self.paths[name] = path
+            self.kinds[name] = kind
+            self.state[name] = PENDING
+            self.push(name, 1)
+
+    def push(self, name, priority):
+        # Lower priority values load first; later pushes of the same name win.
+        self.order += 1
+        heapq.heappush(self.queue, (priority, self.order, name))
+        self.lock.notify()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.worker, name="asset-loader", daemon=True)
+            self.thread.start()
+
+    def enter_scene(self, scene):
+        with self.lock:
+            self.scene = scene
+            self.note_peak()
+            for name in self.scene_assets.get(scene, ()):
+                if self.state.get(name) == PENDING:
+                    self.push(name, -2)
+            for following in self.next_scenes.get(scene, ()):
+                for name in self.scene_assets.get(following, ()):
+                    if self.state.get(name) == PENDING:
+                        self.push(name, -1)
+
+    def init_mixer(self):
+        if not self.audio:
+            try:
+                pygame.mixer.init()
+                self.audio = True
+            except pygame.error as e:
+                print(f"No audio device, running silent: {e}")
+        if self.audio:
+            total = sum(count for _, count in CHANNEL_GROUPS)
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total + 4))
+            pygame.mixer.set_reserved(total)  # Plain Sound.play() never takes these
+            first = 0
+            for group, count in CHANNEL_GROUPS:
+                self.channels[group] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+                first += count
+        with self.lock:
+            self.mixer_ready = True
+            wanted, self.music_wanted = self.music_wanted, None
+        if wanted is not None:
+            self.play_music(*wanted)
+
+    def worker(self):
+        self.init_mixer()
+        while True:
+            with self.lock:
+                while not self.queue:
+                    self.lock.wait()
+                _, _, name = heapq.heappop(self.queue)
+                if self.state[name] != PENDING:
+                    continue
+                path, kind = self.paths[name], self.kinds[name]
+            asset, state = self.load(name, path, kind)
+            size = resident_bytes(asset)
+            with self.lock:
+                self.loaded[name] = asset
+                self.state[name] = state
+                self.sizes[name] = size
+                self.resident += size
+                self.touch(name)
+                self.evict()
+                self.note_peak()
+                self.lock.notify_all()
+
+    def load(self, name, path, kind):
+        try:
+            if kind == MUSIC:
+                with open(path, "rb") as music_file:
+                    return music_file.read(), READY
+            if not self.audio:
+                return SILENCE, READY
+            return pygame.mixer.Sound(path), READY
+        except (OSError, pygame.error) as e:
+            print(f"Sound error ({name}), playing silence instead: {e}")
+            return SILENCE, MISSING
+
+    # -------------------------
+    # Memory budget (called with the lock held)
+    # -------------------------
+    def touch(self, name):
+        self.uses += 1
+        self.last_used[name] = self.uses
+
+    def evict(self):
+        if self.resident <= self.budget:
+            return
+        current = set(self.scene_assets.get(self.scene, ()))
+        following = {name for scene in self.next_scenes.get(self.scene, ())
+                     for name in self.scene_assets.get(scene, ())}
+        candidates = [name for name, state in self.state.items()
+                      if state == READY and self.sizes.get(name) and name not in current]
+        # Assets no following scene needs go first, each group least recently used first.
+        candidates.sort(key=lambda name: (name in following, self.last_used.get(name, 0)))
+        for name in candidates:
+            if self.resident <= self.budget:
+                break
+            self.resident -= self.sizes.pop(name)
+            del self.loaded[name]
+            self.state[name] = PENDING
+            self.evictions += 1
+
+    def note_peak(self):
+        if self.scene is not None:
+            self.scene_peaks[self.scene] = max(self.scene_peaks.get(self.scene, 0), self.resident)
+
+    # -------------------------
+    # Main-thread access
+    # -------------------------
+    def status(self):
+        with self.lock:
+            return dict(self.state)
+
+    def ready(self, name):
+        return self.state.get(name) != PENDING
+
+    def wait(self, name, timeout=None):
+        with self.lock:
+            return self.lock.wait_for(lambda: self.state.get(name) != PENDING, timeout)
+
+    def sound(self, name):
+        # Never blocks: a sound that is not decoded yet plays as silence.
+        with self.lock:
+            if self.state.get(name) != READY:
+                return SILENCE
+            self.touch(name)
+            return self.loaded[name]
+
+    def play(self, name, group):
+        """Plays a sound on its group's reserved channels, replacing the oldest one if all are busy."""
+        sound = self.sound(name)
+        channels = self.channels.get(group)
+        if sound is SILENCE or not channels:
+            return sound.play()
+        for channel in channels:
+            if not channel.get_busy():
+                break
+        else:
+            channel = channels[0]
+        # Keep the group in start order, so channels[0] is always the oldest sound.
+        channels.remove(channel)
+        channels.append(channel)
+        channel.play(sound)
+        return channel
+
+    def play_music(self, name, loops=-1):
+        with self.lock:
+            if not self.mixer_ready:
+                self.music_wanted = (name, loops)  # init_mixer() starts it
+                return
+        if not self.audio:
+            return
+        with self.lock:
+            state = self.state.get(name)
+            data = self.loaded.get(name) if state == READY else None
+            if data is not None:
+                self.touch(name)
+        if state == MISSING:
+            pygame.mixer.music.stop()
+            return
+        try:
+            if data is not None:
+                pygame.mixer.music.load(io.BytesIO(data), os.path.basename(self.paths[name]))
+            else:
+                # Not read into memory yet (or dropped for the budget); streaming
+                # straight from disk is still cheap.
+                pygame.mixer.music.load(self.paths[name])
+            pygame.mixer.music.play(loops)
+        except pygame.error as e:
+            print(f"Error loading music ({name}): {e}")
+            pygame.mixer.music.stop()  # Not the last scene's track instead
+
+    def stop_music(self):
+        with self.lock:
+            self.music_wanted = None
+        if self.audio:
+            pygame.mixer.music.stop()
+
+    def memory_report(self):
+        """Peak resident audio memory per scene, in the order the scenes came up."""
+        with self.lock:
+            lines = [f"{scene:<10} {peak / (1024 * 1024):7.2f} MB" for scene, peak in self.scene_peaks.items()]
+            lines.append(f"{'now':<10} {self.resident / (1024 * 1024):7.2f} MB of "
+                         f"{self.budget / (1024 * 1024):.2f} MB budget, {self.evictions} evictions")
+        return lines
@@ -0,0 +1,686 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from collections import deque
+
+# -------------------------
+# Headless Scene Benchmark
+# -------------------------
+# Every run plays one scene of py.py in a fresh process under the SDL dummy drivers.
+# A BenchClock replaces the clock the scene loop ticks: it never sleeps, times each
+# frame and posts that scene's scripted events, so the numbers show how fast a frame
+# can be made.
+RESULT_PREFIX = "BENCH_RESULT "
+CLICK_BATCH = 500  # Clicks posted per frame when building up sparkles
+
+class BenchDone(Exception):
+    pass
+
+class BenchClock:
+    """Stands in for py.clock: times each frame and posts script(frame) as the next frame's events."""
+
+    def __init__(self, frames, warmup=5):
+        self.frames = frames
+        self.warmup = warmup
+        self.script = lambda frame: []
+        self.target_fps = 0
+        self.frame = 0
+        self.last = None
+        self.times = []
+
+    def tick(self, framerate=0):
+        now = time.perf_counter()
+        if self.last is not None and self.frame > self.warmup:
+            self.times.append(now - self.last)
+        self.target_fps = framerate
+        self.frame += 1
+        if len(self.times) >= self.frames:
+            raise BenchDone()
+        import pygame
+        for event in self.script(self.frame):
+            pygame.event.post(event)
+        # Posting the script is harness work, so the next frame starts after it.
+        self.last = time.perf_counter()
+        return int((self.last - now) * 1000)
+
+def click(pos):
+    import pygame
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+def key(code, char=""):
+    import pygame
+    return pygame.event.Event(pygame.KEYDOWN, key=code, unicode=char, mod=0, scancode=0)
+
+def typed(text):
+    return [key(ord(char), char) for char in text]
+
+# -------------------------
+# Scene Scripts
+# -------------------------
+def bench_warning(game, clock, load):
+    # Reject once (bigger YES button, new backdrop), then keep clicking empty space.
+    def script(frame):
+        if frame == 5:
+            return [click((500, 450))]
+        if frame % 10 == 0:
+            return [click((50, 550))]
+        return []
+    clock.script = script
+    game.play(game.WarningScene())
+
+def bench_guess(game, clock, load):
+    # Type and erase a digit, and enter a wrong guess every 30 frames; never use the last attempt.
+    import pygame
+    wrong = str(game.session.target % 666 + 1)
+    def script(frame):
+        if frame % 30 == 0 and frame // 30 < game.session.max_attempts:
+            return typed(wrong) + [key(pygame.K_RETURN)]
+        if frame % 30 == 10:
+            return typed("6")
+        if frame % 30 == 20:
+            return [key(pygame.K_BACKSPACE)]
+        return []
+    clock.script = script
+    game.play(game.GuessScene())
+
+def cycle_policy(core):
+    # Follows a Hamiltonian cycle of the board (top row, serpentine, left column), so a
+    # snake of any length below the cell count never runs into itself.
+    from demon_core import BLOCK_SIZE, COLS, ROWS, LEFT, RIGHT, UP, DOWN
+    col, row = core.x // BLOCK_SIZE, core.y // BLOCK_SIZE
+    if row == 0:
+        return RIGHT if col < COLS - 1 else DOWN
+    if col == 0:
+        return UP
+    if row % 2:
+        if col > 1:
+            return LEFT
+        return DOWN if row < ROWS - 1 else LEFT
+    return RIGHT if col < COLS - 1 else DOWN
+
+def bench_demon(game, clock, load):
+    # Hard Time chasing food with endless lives; a "length" load grows the snake first.
+    import pygame
+    from demon_core import DemonCore, greedy_food_policy, LEFT, RIGHT, UP, DOWN
+    action_keys = {LEFT: pygame.K_LEFT, RIGHT: pygame.K_RIGHT, UP: pygame.K_UP, DOWN: pygame.K_DOWN}
+    enemies = load.get("enemies", game.DIFFICULTY_ENEMIES[game.DIFFICULTY])
+    length = load.get("length", 1)
+    core = DemonCore(seed=0, num_enemies=enemies, lives=10 ** 9, target_score=10 ** 9)
+    policy = greedy_food_policy
+    if length > 1:
+        policy = cycle_policy
+        core.snake_length = length
+        core.fast_forward(length, policy)
+    def script(frame):
+        action = policy(core)
+        return [key(action_keys[action])] if action else []
+    clock.script = script
+    game.play(game.DemonScene(core))
+
+def bench_hell(game, clock, load):
+    # The ESCAPE button shows up again the frame after it hides; nobody clicks it.
+    game.ESCAPE_BUTTON_CHANCE = 1.0
+    game.play(game.HellScene())
+
+def bench_escape(game, clock, load):
+    # Click-spawn `sparkles` sparkles during warm-up, then keep clicking a few per frame.
+    # The cap and the spawn limiter are lifted to that many, so the load is really there.
+    # A "clicks" load instead clicks that many times every frame against the game's limits.
+    rng = random.Random(1)
+    if "clicks" in load:
+        clicks = load["clicks"]
+        clock.script = lambda frame: [click((rng.randrange(0, 700), rng.randrange(100, 600)))
+                                      for _ in range(clicks)]
+        game.play(game.EscapeScene())
+        return
+    sparkles = load.get("sparkles", 200)
+    game.SPARKLE_CAP = game.SPARKLE_SPAWN_BURST = max(game.SPARKLE_CAP, sparkles + 10)
+    clock.warmup = sparkles // CLICK_BATCH + 5
+    def script(frame):
+        count = min(CLICK_BATCH, sparkles - (frame - 1) * CLICK_BATCH)
+        if count <= 0:
+            count = 1 if frame % 10 == 0 else 0
+        return [click((rng.randrange(0, 700), rng.randrange(100, 600))) for _ in range(count)]
+    clock.script = script
+    game.play(game.EscapeScene())
+
+SCENES = {
+    "warning": bench_warning,
+    "guess": bench_guess,
+    "demon": bench_demon,
+    "hell": bench_hell,
+    "escape": bench_escape,
+}
+
+BASE_RUNS = [
+    ("warning", {}),
+    ("guess", {}),
+    ("demon", {}),
+    ("hell", {}),
+    ("escape", {"sparkles": 200}),
+]
+
+# name -> (scene, load parameter, values, fixed load)
+SWEEPS = {
+    "enemies": ("demon", "enemies", [6, 60, 600, 3000, 10000, 30000, 100000], {}),
+    "snake_length": ("demon", "length", [1, 100, 300, 600, 900, 1100], {"enemies": 0}),
+    "sparkles": ("escape", "sparkles", [10, 100, 1000, 5000, 20000, 50000], {}),
+    "clicks": ("escape", "clicks", [1, 10, 100, 1000], {}),
+}
+
+# -------------------------
+# One Run (child process)
+# -------------------------
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Not available on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def load_game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import py as game
+
+    random.seed(0)
+    game.idle_wait = False  # Every frame is drawn, so the numbers are per-frame costs
+    game.startup = game.StartupTimer(time.perf_counter())
+    game.init_display()
+    game.init_fonts()
+    game.init_audio()
+    game.reset_game()
+    return game
+
+def run_scene(scene, load, frames):
+    game = load_game()
+    clock = game.clock = BenchClock(frames)
+    try:
+        SCENES[scene](game, clock, load)
+    except (BenchDone, SystemExit):
+        pass
+
+    times = sorted(clock.times)
+    total = sum(times)
+    return {
+        "scene": scene,
+        "load": load,
+        "frames": len(times),
+        "fps": len(times) / total if total else 0.0,
+        "p50_ms": times[len(times) // 2] * 1000 if times else 0.0,
+        "p99_ms": times[min(len(times) - 1, int(len(times) * 0.99))] * 1000 if times else 0.0,
+        "target_fps": clock.target_fps,
+        "peak_rss_mb": peak_memory_mb(),
+    }
+
+# -------------------------
+# Hard Time Key-to-Move Latency (child process)
+# -------------------------
+class DeadlineClock:
+    """
+    A real pygame Clock (so frames are paced as in the game) that ends the run after
+    `seconds`. It also plays key presses at random moments (Poisson, `rate` per second).
+    Each press is posted at the first tick after its moment and stamped with the moment
+    itself, so the measured latency includes waiting for the next event poll.
+    """
+
+    def __init__(self, seconds, rate, seed=2):
+        import pygame
+        self.clock = pygame.time.Clock()
+        start = time.perf_counter()
+        self.deadline = start + seconds
+        rng = random.Random(seed)
+        keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+        self.presses = deque()
+        moment = start + rng.expovariate(rate)
+        while moment < self.deadline:
+            self.presses.append((moment, rng.choice(keys)))
+            moment += rng.expovariate(rate)
+
+    def tick(self, framerate=0):
+        import pygame
+        elapsed = self.clock.tick(framerate)
+        now = time.perf_counter()
+        if now >= self.deadline:
+            raise BenchDone()
+        while self.presses and self.presses[0][0] <= now:
+            moment, code = self.presses.popleft()
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=code, unicode="", mod=0,
+                                                 scancode=0, posted_at=moment))
+        return elapsed
+
+def run_latency(fps, seconds, rate):
+    from demon_core import DemonCore
+    game = load_game()
+    game.clock = DeadlineClock(seconds, rate)
+    scene = game.DemonScene(DemonCore(seed=0, lives=10 ** 9, target_score=10 ** 9), fps=fps)
+    try:
+        game.play(scene)
+    except (BenchDone, SystemExit):
+        pass
+    latencies = sorted(scene.move_latencies)
+    return {
+        "display_fps": fps,
+        "moves": len(latencies),
+        "dropped": scene.dropped_inputs,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0,
+    }
+
+def measure_latency(seconds, rate):
+    # Frames tied to the 15 Hz snake step (the old loop) against the 60 Hz fixed-step loop.
+    from demon_core import SNAKE_SPEED
+    print(f"{'display fps':>11} {'moves':>6} {'dropped':>7} {'mean ms':>8} {'p50 ms':>7} {'p99 ms':>7}")
+    for fps in (SNAKE_SPEED, 60):
+        command = [sys.executable, os.path.abspath(__file__), "--latency-child", json.dumps([fps, seconds, rate])]
+        output = subprocess.run(command, capture_output=True, text=True).stdout
+        for line in output.splitlines():
+            if line.startswith(RESULT_PREFIX):
+                result = json.loads(line[len(RESULT_PREFIX):])
+                print(f"{result['display_fps']:>11} {result['moves']:>6} {result['dropped']:>7} "
+                      f"{result['mean_ms']:>8.1f} {result['p50_ms']:>7.1f} {result['p99_ms']:>7.1f}")
+
+# -------------------------
+# Idle Scenes: CPU Time Against Polling (child process)
+# -------------------------
+# Scenes that sit still until the player acts; each runs for real with the game's own
+# clock, once polling at its frame rate and once in idle mode, with no input at all.
+IDLE_SCENES = {
+    "warning": "WarningScene",
+    "guess": "GuessScene",
+    "lose": "LoseScene",
+    "hell": "HellScene",
+}
+
+def run_idle(scene, idle, seconds):
+    import threading
+    import pygame
+    game = load_game()
+    game.idle_wait = idle
+    for name in game.assets.status():
+        game.assets.wait(name)  # Decoding on the loader thread is not part of either mode
+    # Closing the window ends the run; the timer thread only posts the event.
+    quit_later = threading.Timer(seconds, lambda: pygame.event.post(pygame.event.Event(pygame.QUIT)))
+    start, start_cpu = time.perf_counter(), time.process_time()
+    quit_later.start()
+    try:
+        game.play(getattr(game, IDLE_SCENES[scene])())
+    except SystemExit:
+        pass
+    return {
+        "scene": scene,
+        "idle": idle,
+        "seconds": time.perf_counter() - start,
+        "cpu_s": time.process_time() - start_cpu,
+        "wakeups": game.manager.frames,
+        "drawn": game.manager.presents,
+    }
+
+def measure_idle(seconds):
+    print(f"{'scene':<8} {'mode':<7} {'wakeups':>7} {'drawn':>6} {'cpu s':>7} {'cpu %':>6}")
+    for scene in IDLE_SCENES:
+        cpu = {}
+        for idle in (False, True):
+            command = [sys.executable, os.path.abspath(__file__), "--idle-child", json.dumps([scene, idle, seconds])]
+            output = subprocess.run(command, capture_output=True, text=True).stdout
+            for line in output.splitlines():
+                if line.startswith(RESULT_PREFIX):
+                    result = json.loads(line[len(RESULT_PREFIX):])
+                    cpu[idle] = result["cpu_s"]
+                    print(f"{scene:<8} {'idle' if idle else 'polling':<7} {result['wakeups']:>7} {result['drawn']:>6} "
+                          f"{result['cpu_s']:>7.3f} {result['cpu_s'] / result['seconds'] * 100:>6.1f}")
+        if len(cpu) == 2 and cpu[False]:
+            saved = cpu[False] - cpu[True]
+            print(f"{'':<8} saved {saved:.3f} CPU s in {seconds:g} s ({saved / cpu[False] * 100:.0f}% of polling)")
+
+# -------------------------
+# Input-to-Display Latency of the Interactive Scenes (child process)
+# -------------------------
+# Each scene runs for real, with the game's clock and idle mode as shipped, while a
+# thread posts keys and clicks at random moments (Poisson, `rate` per second), stamped
+# with when they were posted. When an input switches to another scene (YES, ESCAPE,
+# Hard Time), that scene draws one frame and then a fresh copy of the scene under test
+# takes over, so the switch itself is measured again and again.
+def warning_input(rng):
+    # Mostly NO (redraws the backdrop), sometimes YES (switches to the guess screen).
+    return click((500, 450)) if rng.random() < 0.75 else click((300, 450))
+
+def guess_input(rng):
+    # Typing and deleting digits, now and then the Hard Time button; never Enter.
+    roll = rng.random()
+    if roll < 0.1:
+        return click((720, 530))
+    if roll < 0.4:
+        import pygame
+        return key(pygame.K_BACKSPACE)
+    digit = str(rng.randint(0, 9))
+    return key(ord(digit), digit)
+
+def hell_input(rng):
+    # ESCAPE half the time, empty space otherwise.
+    return click((675, 540)) if rng.random() < 0.5 else click((rng.randrange(550), rng.randrange(600)))
+
+def demon_input(rng):
+    import pygame
+    return key(rng.choice((pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)))
+
+def escape_input(rng):
+    # Sparkles anywhere but the X button.
+    return click((rng.randrange(700), rng.randrange(100, 600)))
+
+def pinned_hell(game):
+    class PinnedHell(game.HellScene):
+        # The ESCAPE button is up from the start and stays up.
+        def enter(self):
+            super().enter()
+            self.escape_button_active = True
+
+        def next_change(self):
+            return None
+
+        def update(self):
+            pass
+    return PinnedHell()
+
+def endless_demon(game):
+    from demon_core import DemonCore
+    return game.DemonScene(DemonCore(seed=0, lives=10 ** 9, target_score=10 ** 9))
+
+INPUT_SCENES = {
+    "warning": (lambda game: game.WarningScene(), warning_input),
+    "guess": (lambda game: game.GuessScene(), guess_input),
+    "hell": (pinned_hell, hell_input),
+    "demon": (endless_demon, demon_input),
+    "escape": (lambda game: game.EscapeScene(), escape_input),
+}
+
+def post_inputs(make_input, rate, seconds, seed=3):
+    import pygame
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + seconds
+    posted = 0
+    while True:
+        time.sleep(rng.expovariate(rate))
+        if time.perf_counter() >= deadline:
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return posted
+        event = make_input(rng)
+        event.posted_at = time.perf_counter()
+        pygame.event.post(event)
+        posted += 1
+
+def run_input_latency(scene, seconds, rate):
+    import threading
+    os.environ.pop("DEVIL_LATENCY", None)
+    game = load_game()
+    game.idle_wait = True  # Measured as shipped: still scenes sleep until input
+    game.init_latency()
+    for name in game.assets.status():
+        game.assets.wait(name)
+    make_scene, make_input = INPUT_SCENES[scene]
+
+    def return_home(screen):
+        if game.manager.scene.name != scene and game.manager.next_scene is None:
+            game.manager.switch(make_scene(game))
+    game.renderer.after_present.append(return_home)
+    injector = threading.Thread(target=post_inputs, args=(make_input, rate, seconds), daemon=True)
+    injector.start()
+    try:
+        game.play(make_scene(game))
+    except SystemExit:
+        pass
+    return {"scene": scene, "rows": game.latency.summary()}
+
+def measure_input_latency(seconds, rate, max_p99=None):
+    """Prints every scene's latency table; returns True if any p99 is over max_p99 ms."""
+    print(f"{'scene':<8} {'input in':<9} {'input':<6} {'count':>6} {'mean ms':>8} {'p50 ms':>7} {'p90 ms':>7} "
+          f"{'p99 ms':>7} {'max ms':>7}")
+    over = []
+    for scene in INPUT_SCENES:
+        command = [sys.executable, os.path.abspath(__file__), "--input-latency-child",
+                   json.dumps([scene, seconds, rate])]
+        output = subprocess.run(command, capture_output=True, text=True).stdout
+        result = None
+        for line in output.splitlines():
+            if line.startswith(RESULT_PREFIX):
+                result = json.loads(line[len(RESULT_PREFIX):])
+        if result is None:
+            print(f"{scene:<8} produced no result")
+            over.append(scene)
+            continue
+        for where, kind, count, mean, p50, p90, p99, worst in result["rows"]:
+            print(f"{scene:<8} {where:<9} {kind:<6} {count:>6} {mean:>8.1f} {p50:>7.1f} {p90:>7.1f} "
+                  f"{p99:>7.1f} {worst:>7.1f}")
+            if max_p99 is not None and p99 > max_p99:
+                over.append(f"{where} {kind}")
+    if over:
+        print(f"Over the {max_p99} ms p99 limit: {', '.join(over)}")
+    return bool(over)
+
+# -------------------------
+# Draw Cost per Entity
+# -------------------------
+# Per-shape draw calls (how the dragon, enemies and snake used to be drawn), kept here
+# as the baseline for the baked sprites the game now blits in one batch.
+def rect_dragon(screen, x, y):
+    from py import YELLOW, BLACK
+    import pygame
+    pygame.draw.rect(screen, YELLOW, (x, y, 120, 60))
+    pygame.draw.rect(screen, YELLOW, (x + 20, y - 40, 60, 40))
+    pygame.draw.rect(screen, YELLOW, (x - 40, y + 20, 40, 20))
+    pygame.draw.rect(screen, BLACK, (x + 90, y + 10, 10, 10))
+    pygame.draw.rect(screen, YELLOW, (x + 40, y - 10, 10, 10))
+    pygame.draw.rect(screen, YELLOW, (x + 60, y - 20, 10, 10))
+
+def rect_enemy(screen, x, y):
+    from py import RED, BLACK
+    from demon_core import BLOCK_SIZE
+    import pygame
+    pygame.draw.rect(screen, RED, (x, y, BLOCK_SIZE, BLOCK_SIZE))
+    pygame.draw.rect(screen, BLACK, (x + 5, y + 5, 5, 5))
+
+def rect_segment(screen, x, y):
+    from py import YELLOW
+    from demon_core import BLOCK_SIZE
+    import pygame
+    pygame.draw.rect(screen, YELLOW, (x, y, BLOCK_SIZE, BLOCK_SIZE))
+
+def measure_draw_cost(counts, repeats=20):
+    # Microseconds per instance, drawing `count` instances at random spots on the board.
+    from demon_core import BLOCK_SIZE, WIDTH, HEIGHT
+    game = load_game()
+    for name in game.assets.status():
+        game.assets.wait(name)  # Keep the loader thread out of the timings
+    game.DemonScene().enter()  # Bakes the enemy and segment sprites
+    sprites = {
+        "dragon": (rect_dragon, lambda: game.compositor.sprite('dragon', (160, 100), game.build_dragon,
+                                                               colorkey=game.SPRITE_KEY), 40),
+        "enemy": (rect_enemy, lambda: game.compositor.sprite('enemy', None, None), 0),
+        "segment": (rect_segment, lambda: game.compositor.sprite('segment', None, None), 0),
+    }
+    rng = random.Random(3)
+    print(f"{'entity':<8} {'count':>6} {'rects us':>9} {'blits us':>9} {'speed-up':>8}")
+    for name, (draw_rects, sprite, offset) in sprites.items():
+        sprite = sprite()
+        for count in counts:
+            spots = [(rng.randrange(0, WIDTH, BLOCK_SIZE), rng.randrange(0, HEIGHT, BLOCK_SIZE)) for _ in range(count)]
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for x, y in spots:
+                    draw_rects(game.screen, x, y)
+            rects = (time.perf_counter() - start) / (repeats * count) * 1e6
+            start = time.perf_counter()
+            for _ in range(repeats):
+                game.screen.blits([(sprite, (x - offset, y - offset)) for x, y in spots])
+            blits = (time.perf_counter() - start) / (repeats * count) * 1e6
+            print(f"{name:<8} {count:>6} {rects:>9.3f} {blits:>9.3f} {rects / blits:>7.1f}x")
+
+def spawn_run(scene, load, frames):
+    # A fresh process per run keeps peak memory per scene and survives scenes that exit.
+    command = [sys.executable, os.path.abspath(__file__), "--child", json.dumps([scene, load, frames])]
+    output = subprocess.run(command, capture_output=True, text=True).stdout
+    for line in output.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"Benchmark run {scene} {load} produced no result:\n{output}")
+
+# -------------------------
+# Suite, Sweeps and Comparison
+# -------------------------
+def describe(load):
+    return ",".join(f"{name}={value}" for name, value in sorted(load.items())) or "-"
+
+def print_result(result):
+    memory = result["peak_rss_mb"]
+    print(f"{result['scene']:<8} {describe(result['load']):<22} {result['fps']:>9.1f} "
+          f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['target_fps']:>7} "
+          f"{'-' if memory is None else f'{memory:.1f}':>8}")
+
+def print_header():
+    print(f"{'scene':<8} {'load':<22} {'fps':>9} {'p50 ms':>8} {'p99 ms':>8} {'target':>7} {'peak MB':>8}")
+
+def run_suite(scenes, frames, sweeps, sweep_frames):
+    results = []
+    print_header()
+    for scene, load in BASE_RUNS:
+        if scene in scenes:
+            results.append(spawn_run(scene, load, frames))
+            print_result(results[-1])
+
+    breaks = {}
+    for name in sweeps:
+        scene, parameter, values, fixed = SWEEPS[name]
+        breaks[name] = {"scene": scene, "parameter": parameter, "drops_below_target_at": None}
+        for value in values:
+            result = spawn_run(scene, dict(fixed, **{parameter: value}), sweep_frames)
+            result["sweep"] = name
+            results.append(result)
+            print_result(result)
+            if result["fps"] < result["target_fps"]:
+                breaks[name]["drops_below_target_at"] = value
+                break
+    for name, found in breaks.items():
+        value = found["drops_below_target_at"]
+        verdict = f"drops below target at {value}" if value is not None else "holds target over the whole sweep"
+        print(f"Sweep {name}: {found['scene']} {verdict}")
+    return results, breaks
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(baseline, results, tolerance):
+    """Prints fps and p99 changes against a saved baseline; returns the regressed runs."""
+    old = {(r["scene"], describe(r["load"])): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nAgainst {baseline.get('label') or baseline.get('revision')} ({baseline.get('created')}):")
+    for result in results:
+        previous = old.get((result["scene"], describe(result["load"])))
+        if previous is None or not previous["fps"]:
+            continue
+        fps_change = result["fps"] / previous["fps"] - 1
+        p99_change = result["p99_ms"] / previous["p99_ms"] - 1 if previous["p99_ms"] else 0.0
+        regressed = fps_change < -tolerance or p99_change > tolerance
+        if regressed:
+            regressions.append(result)
+        print(f"{result['scene']:<8} {describe(result['load']):<22} fps {fps_change:+7.1%}  "
+              f"p99 {p99_change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark of every scene in py.py.")
+    parser.add_argument("--scenes", default=",".join(SCENES), help="comma-separated scenes to run")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per run")
+    parser.add_argument("--sweep", default="", help=f"comma-separated load sweeps ({','.join(SWEEPS)}) or 'all'")
+    parser.add_argument("--sweep-frames", type=int, default=120)
+    parser.add_argument("--output", default="bench_results.json", help="where to save the results")
+    parser.add_argument("--label", default=None, help="name for this run in the results file")
+    parser.add_argument("--compare", default=None, help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed fps/p99 change before it counts as a regression")
+    parser.add_argument("--latency", type=float, default=None, metavar="SECONDS",
+                        help="instead of the suite, measure Hard Time key-to-move latency for this long per mode")
+    parser.add_argument("--key-rate", type=float, default=4.0, help="injected key presses per second for --latency")
+    parser.add_argument("--input-latency", type=float, default=None, metavar="SECONDS",
+                        help="input-to-display latency of every interactive scene, injecting input for this long each")
+    parser.add_argument("--input-rate", type=float, default=5.0, help="injected inputs per second for --input-latency")
+    parser.add_argument("--max-p99", type=float, default=None, metavar="MS",
+                        help="with --input-latency: exit 1 if any scene's p99 is over this")
+    parser.add_argument("--idle", type=float, default=None, metavar="SECONDS",
+                        help="CPU time of the still scenes in idle mode against polling, this long each")
+    parser.add_argument("--draw-cost", default=None, metavar="COUNTS",
+                        help="comma-separated instance counts: draw cost per dragon, enemy and snake segment")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--idle-child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--latency-child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--input-latency-child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        scene, load, frames = json.loads(args.child)
+        print(RESULT_PREFIX + json.dumps(run_scene(scene, load, frames)), flush=True)
+        return
+    if args.latency_child:
+        print(RESULT_PREFIX + json.dumps(run_latency(*json.loads(args.latency_child))), flush=True)
+        return
+    if args.input_latency_child:
+        print(RESULT_PREFIX + json.dumps(run_input_latency(*json.loads(args.input_latency_child))), flush=True)
+        return
+    if args.idle_child:
+        print(RESULT_PREFIX + json.dumps(run_idle(*json.loads(args.idle_child))), flush=True)
+        return
+    if args.latency:
+        measure_latency(args.latency, args.key_rate)
+        return
+    if args.input_latency:
+        if measure_input_latency(args.input_latency, args.input_rate, args.max_p99):
+            sys.exit(1)
+        return
+    if args.draw_cost:
+        measure_draw_cost([int(count) for count in args.draw_cost.split(",")])
+        return
+    if args.idle:
+        measure_idle(args.idle)
+        return
+
+    scenes = [name for name in args.scenes.split(",") if name]
+    sweeps = list(SWEEPS) if args.sweep == "all" else [name for name in args.sweep.split(",") if name]
+    for name in scenes + sweeps:
+        if name not in SCENES and name not in SWEEPS:
+            parser.error(f"unknown scene or sweep: {name}")
+
+    results, breaks = run_suite(scenes, args.frames, sweeps, args.sweep_frames)
+    report = {
+        "label": args.label,
+        "revision": git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "frames": args.frames,
+        "results": results,
+        "sweeps": breaks,
+    }
+    with open(args.output, "w", encoding="utf-8") as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(baseline, results, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
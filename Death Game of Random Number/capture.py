@@ -0,0 +1,203 @@
+import os
+import sys
+import zlib
+import queue
+import struct
+import argparse
+import threading
+import numpy as np
+import pygame
+
+# -------------------------
+# Capture File Format
+# -------------------------
+# Header, then one frame after another: a FRAME header and that many bytes of zlib data.
+# A key frame holds the pixels themselves; any other frame holds them XORed with the
+# frame before, so whatever stayed put is zeros and compresses to almost nothing.
+# Pixels are 32-bit values in the display's own layout (or, for a display that is not
+# 32-bit, that of a 32-bit surface it is converted to); the header keeps the masks and shifts.
+MAGIC = b"DVLC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHH4I4B")  # magic, version, width, height, RGBA masks, RGBA shifts
+FRAME = struct.Struct("<IIHHBI")      # frame number, game ms, width, height, flags, data length
+KEY_FRAME = 1
+KEY_EVERY = 120  # A key frame at least this often, so a damaged file only loses a few seconds
+
+class FrameCapture:
+    """
+    Hooks Renderer.after_present and saves every presented frame. The render thread
+    copies the display pixels (through a surfarray view, no conversion) straight into
+    one of `ring` preallocated buffers and hands its index to a worker thread, which
+    delta-encodes, compresses and writes it. Nothing in the game ever waits on it:
+    with half the ring in use it captures at half size, and with no buffer free the
+    frame is skipped.
+    A display that is not 32 bits per pixel is blitted into a 32-bit surface first,
+    since pixels2d only matches the uint32 buffers on a 32-bit surface.
+    """
+
+    def __init__(self, path, screen, clock, ring=8):
+        width, height = screen.get_size()
+        self.clock = clock  # -> game time in ms
+        self.staging = None  # 32-bit copy of the display, when the display is not 32-bit
+        if screen.get_bytesize() != 4:
+            self.staging = pygame.Surface((width, height), 0, 32)
+        layout = screen if self.staging is None else self.staging
+        self.buffers = [np.empty((height, width), np.uint32) for _ in range(ring)]
+        self.free = queue.SimpleQueue()
+        for index in range(ring):
+            self.free.put(index)
+        self.filled = queue.SimpleQueue()
+        self.free_count = ring
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.skipped = 0
+        self.downscaled = 0
+        self.bytes_written = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, width, height, *layout.get_masks(), *layout.get_shifts()))
+        self.thread = threading.Thread(target=self.worker, name="frame-capture", daemon=True)
+        self.thread.start()
+
+    def __call__(self, screen):
+        with self.lock:
+            if self.free_count == 0:
+                self.skipped += 1
+                return
+            self.free_count -= 1
+            behind = self.free_count < len(self.buffers) // 2
+        index = self.free.get()
+        buffer = self.buffers[index]
+        if self.staging is not None:
+            self.staging.blit(screen, (0, 0))
+            screen = self.staging
+        pixels = pygame.surfarray.pixels2d(screen).T  # (height, width), rows contiguous
+        if behind:
+            height, width = (pixels.shape[0] + 1) // 2, (pixels.shape[1] + 1) // 2
+            frame = buffer[:height, :width]
+            np.copyto(frame, pixels[::2, ::2])
+            self.downscaled += 1
+        else:
+            frame = buffer
+            np.copyto(frame, pixels)
+        del pixels  # Unlocks the display surface for the next frame's blits
+        self.frames += 1
+        self.filled.put((index, self.frames, self.clock(), frame.shape))
+
+    def worker(self):
+        previous = None
+        since_key = KEY_EVERY
+        while True:
+            item = self.filled.get()
+            if item is None:
+                break
+            index, number, ms, (height, width) = item
+            frame = self.buffers[index][:height, :width]
+            if previous is None or previous.shape != frame.shape or since_key >= KEY_EVERY:
+                flags, since_key = KEY_FRAME, 0
+                data = zlib.compress(frame.tobytes(), 1)
+                previous = frame.copy()
+            else:
+                flags, since_key = 0, since_key + 1
+                delta = np.bitwise_xor(frame, previous)
+                data = zlib.compress(delta.tobytes(), 1)
+                np.copyto(previous, frame)
+            self.free.put(index)
+            with self.lock:
+                self.free_count += 1
+            self.file.write(FRAME.pack(number, ms & 0xFFFFFFFF, width, height, flags, len(data)))
+            self.file.write(data)
+            self.bytes_written += FRAME.size + len(data)
+        self.file.close()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.filled.put(None)
+            self.thread.join()
+
+    def stats(self):
+        return {"frames": self.frames, "skipped": self.skipped, "downscaled": self.downscaled,
+                "bytes": self.bytes_written}
+
+# -------------------------
+# Reading Captures
+# -------------------------
+def read_frames(path):
+    """Yields (frame number, game ms, pixels) for each frame, pixels as a (height, width) uint32 array."""
+    with open(path, "rb") as capture_file:
+        data = capture_file.read()
+    magic, version, width, height, *layout = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} capture")
+    position = HEADER.size
+    previous = None
+    while position + FRAME.size <= len(data):
+        number, ms, width, height, flags, length = FRAME.unpack_from(data, position)
+        position += FRAME.size
+        if position + length > len(data):
+            break  # Cut off while writing
+        pixels = np.frombuffer(zlib.decompress(data[position:position + length]), np.uint32)
+        pixels = pixels.reshape(height, width)
+        position += length
+        if not flags & KEY_FRAME:
+            if previous is None:
+                continue  # No key frame to apply it to
+            pixels = np.bitwise_xor(pixels, previous)
+        previous = pixels
+        yield number, ms, pixels
+
+def capture_layout(path):
+    with open(path, "rb") as capture_file:
+        _, _, width, height, *layout = HEADER.unpack(capture_file.read(HEADER.size))
+    return (width, height), layout[:4], layout[4:]
+
+def to_surface(pixels, size, masks, shifts):
+    # Display-format pixels to an RGB surface, scaled back up if captured at half size.
+    rgb = np.empty(pixels.shape + (3,), np.uint8)
+    for channel in range(3):
+        rgb[..., channel] = (pixels & masks[channel]) >> shifts[channel]
+    surface = pygame.image.frombuffer(rgb.tobytes(), (pixels.shape[1], pixels.shape[0]), "RGB")
+    if surface.get_size() != size:
+        surface = pygame.transform.scale(surface, size)
+    return surface
+
+# -------------------------
+# Command Line: Capture to Image Sequence
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Turn a capture from py.py --capture into numbered images.")
+    parser.add_argument("capture")
+    parser.add_argument("output", help="directory for the images")
+    parser.add_argument("--format", default="png", choices=("png", "bmp", "jpg", "tga"))
+    parser.add_argument("--fps", type=float, default=None,
+                        help="write a steady sequence at this rate (repeating frames across idle gaps) "
+                             "instead of one image per captured frame")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    size, masks, shifts = capture_layout(args.capture)
+    written = 0
+
+    def save(surface):
+        nonlocal written
+        written += 1
+        pygame.image.save(surface, os.path.join(args.output, f"frame_{written:06d}.{args.format}"))
+
+    held = None  # --fps: the frame on screen until the next one's time comes
+    for number, ms, pixels in read_frames(args.capture):
+        surface = to_surface(pixels, size, masks, shifts)
+        if args.fps is None:
+            save(surface)
+            continue
+        if held is None:
+            next_ms = ms
+        else:
+            while next_ms < ms:
+                save(held)
+                next_ms += 1000 / args.fps
+        held = surface
+    if held is not None:
+        save(held)
+    print(f"Wrote {written} images to {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
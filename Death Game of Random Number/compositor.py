@@ -0,0 +1,62 @@
+import pygame
+
+# -------------------------
+# Layered Compositor
+# -------------------------
+class Compositor:
+    """
+    Keeps the static layers of each scene so loops only blit them.
+    Backdrops are built once into an opaque surface already converted to the display
+    format; translucent overlays are preallocated once per (color, alpha). Sprites
+    (shapes drawn many times a frame) are baked once too, so a scene can hand them all
+    to one Surface.blits() call instead of redrawing each shape.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self._backdrops = {}
+        self._overlays = {}
+        self._sprites = {}
+
+    def overlay(self, color, alpha):
+        key = (color, alpha)
+        surface = self._overlays.get(key)
+        if surface is None:
+            surface = pygame.Surface(self.screen.get_size()).convert(self.screen)
+            surface.fill(color)
+            surface.set_alpha(alpha)
+            self._overlays[key] = surface
+        return surface
+
+    def backdrop(self, key, build):
+        # build(surface) paints the static layers; it only runs the first time key is seen.
+        surface = self._backdrops.get(key)
+        if surface is None:
+            surface = pygame.Surface(self.screen.get_size()).convert(self.screen)
+            build(surface)
+            self._backdrops[key] = surface
+        return surface
+
+    def sprite(self, key, size, build, colorkey=None):
+        # build(surface) draws the shape once. With a colorkey, pixels left in that color
+        # are see-through; RLE encoding makes blitting skip those runs instead of testing
+        # every pixel.
+        surface = self._sprites.get(key)
+        if surface is None:
+            surface = pygame.Surface(size).convert(self.screen)
+            if colorkey is not None:
+                surface.fill(colorkey)
+            build(surface)
+            if colorkey is not None:
+                surface.set_colorkey(colorkey, pygame.RLEACCEL)
+            self._sprites[key] = surface
+        return surface
+
+    def draw_backdrop(self, key, build):
+        self.screen.blit(self.backdrop(key, build), (0, 0))
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._backdrops.clear()
+        else:
+            self._backdrops.pop(key, None)
@@ -0,0 +1,278 @@
+import random
+import time
+import argparse
+import numpy as np
+from snake_body import SnakeBody
+from enemy_swarm import EnemySwarm
+
+# -------------------------
+# Bloody Demon Mode Rules (no pygame needed)
+# -------------------------
+WIDTH       = 800
+HEIGHT      = 600
+BLOCK_SIZE  = 20
+COLS        = WIDTH // BLOCK_SIZE
+ROWS        = HEIGHT // BLOCK_SIZE
+SPAWN_X     = 400
+SPAWN_Y     = 300
+SNAKE_SPEED = 15  # Ticks per second on screen
+ENEMY_SPEEDS = (-4, -3, 3, 4)
+
+# Enemy count per difficulty tier. Past SWARM_THRESHOLD enemies the core switches from
+# a plain list to a NumPy EnemySwarm.
+DIFFICULTY_ENEMIES = {
+    "normal": 6,
+    "nightmare": 60,
+    "inferno": 600,
+    "abyss": 3000,
+}
+SWARM_THRESHOLD = 32
+# Ticks after each (re)spawn in which enemies cannot take a life, per tier. The board is
+# 1200 cells, so from a few hundred enemies on the spawn point is never clear and without
+# it every life goes in the first ticks. "normal" keeps the original rules: no grace.
+DIFFICULTY_GRACE_TICKS = {
+    "normal": 0,
+    "nightmare": 15,
+    "inferno": 30,
+    "abyss": 45,
+}
+
+LEFT, RIGHT, UP, DOWN = "left", "right", "up", "down"
+DIRECTIONS = {
+    LEFT:  (-BLOCK_SIZE, 0),
+    RIGHT: (BLOCK_SIZE, 0),
+    UP:    (0, -BLOCK_SIZE),
+    DOWN:  (0, BLOCK_SIZE),
+}
+
+RUNNING, LOST, WON = "running", "lost", "won"
+
+class DemonCore:
+    """
+    State of one Bloody Demon Mode run, advanced one tick at a time with step().
+    All randomness comes from its own seeded RNG so runs are reproducible, and
+    nothing here touches pygame, so it runs as fast as the CPU allows.
+    The body is a SnakeBody on the COLS x ROWS grid, so moving, self-collision and
+    placing food are O(1) however long the snake gets. Large enemy counts live in an
+    EnemySwarm and are moved and tested in one vectorized pass.
+    With grace_ticks, enemies cannot take a life for that many ticks after each (re)spawn.
+    """
+
+    def __init__(self, seed=None, num_enemies=6, lives=3, target_score=1500, grace_ticks=0):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.num_enemies = num_enemies
+        self.grace_ticks = grace_ticks
+        self.start_lives = lives
+        self.target_score = target_score
+        self.snake = SnakeBody(COLS, ROWS)
+        self.swarm = None
+        if num_enemies > SWARM_THRESHOLD:
+            swarm_rng = np.random.default_rng(self.rng.getrandbits(64))
+            self.swarm = EnemySwarm(num_enemies, swarm_rng, WIDTH, HEIGHT, BLOCK_SIZE, ENEMY_SPEEDS)
+        self.reset()
+
+    def reset(self):
+        self.lives = self.start_lives
+        self.score = 0
+        self.ticks = 0
+        self.status = RUNNING
+        self.x, self.y = SPAWN_X, SPAWN_Y
+        self.x_change, self.y_change = 0, 0
+        self.snake.clear()
+        self.snake_length = 1
+        self.grace = self.grace_ticks
+        self.food_x, self.food_y = self.random_food()
+        self.spawn_enemies()
+
+    @property
+    def snake_list(self):
+        # Segment positions in pixels, oldest first.
+        return [[cell % COLS * BLOCK_SIZE, cell // COLS * BLOCK_SIZE] for cell in self.snake.segments]
+
+    def random_food(self):
+        # Uniform over the cells the snake is not on; off the board if there are none.
+        cell = self.snake.random_free_cell(self.rng)
+        if cell is None:
+            return -BLOCK_SIZE, -BLOCK_SIZE
+        return cell % COLS * BLOCK_SIZE, cell // COLS * BLOCK_SIZE
+
+    def spawn_enemies(self):
+        if self.swarm is not None:
+            self.swarm.spawn()
+            return
+        # Each enemy is [x, y, vx, vy].
+        rng = self.rng
+        self.enemies = [
+            [rng.randrange(0, WIDTH - BLOCK_SIZE),
+             rng.randrange(0, HEIGHT - BLOCK_SIZE),
+             rng.choice(ENEMY_SPEEDS),
+             rng.choice(ENEMY_SPEEDS)]
+            for _ in range(self.num_enemies)
+        ]
+
+    def enemy_positions(self):
+        # Where the enemies are now, i.e. where the collision tests see them.
+        if self.swarm is not None:
+            return self.swarm.positions()
+        return ((enemy[0], enemy[1]) for enemy in self.enemies)
+
+    def lose_life(self):
+        # Returns True when that was the last life.
+        self.lives -= 1
+        if self.lives <= 0:
+            self.status = LOST
+            return True
+        self.x, self.y = SPAWN_X, SPAWN_Y
+        self.x_change, self.y_change = 0, 0
+        self.snake.clear()
+        self.snake_length = 1
+        self.grace = self.grace_ticks
+        return False
+
+    def step(self, action=None):
+        """Advance one tick. action is LEFT/RIGHT/UP/DOWN or None to keep going."""
+        if self.status != RUNNING:
+            return self.status
+        self.ticks += 1
+        if self.grace:
+            self.grace -= 1
+        if action is not None:
+            self.x_change, self.y_change = DIRECTIONS[action]
+
+        self.x += self.x_change
+        self.y += self.y_change
+
+        # Check collision with boundaries; this also respawns the enemies.
+        if self.x >= WIDTH or self.x < 0 or self.y >= HEIGHT or self.y < 0:
+            if self.lose_life():
+                return LOST
+            self.spawn_enemies()
+
+        snake = self.snake
+        head_cell = self.y // BLOCK_SIZE * COLS + self.x // BLOCK_SIZE
+        snake.push(head_cell)
+        if len(snake) > self.snake_length:
+            snake.pop_tail()
+
+        # Check self-collision; every older segment on the head's cell costs a life.
+        for _ in range(snake.occupancy[head_cell] - 1):
+            if self.lose_life():
+                return LOST
+
+        if self.swarm is not None:
+            if self.step_swarm():
+                return LOST
+        elif self.step_enemies():
+            return LOST
+
+        # Check if snake eats the food.
+        if self.x == self.food_x and self.y == self.food_y:
+            self.food_x, self.food_y = self.random_food()
+            self.snake_length += 1
+            self.score += 100
+
+        if self.score >= self.target_score:
+            self.status = WON
+        return self.status
+
+    def step_enemies(self):
+        # Move the enemies, then test each against wherever the head is now; after a hit
+        # that is the spawn point, unless the grace period starting there covers it.
+        # Returns True when the last life is lost.
+        edge_x = WIDTH - BLOCK_SIZE
+        edge_y = HEIGHT - BLOCK_SIZE
+        for enemy in self.enemies:
+            enemy[0] += enemy[2]
+            enemy[1] += enemy[3]
+            if enemy[0] <= 0 or enemy[0] >= edge_x:
+                enemy[2] = -enemy[2]
+            if enemy[1] <= 0 or enemy[1] >= edge_y:
+                enemy[3] = -enemy[3]
+            if (not self.grace and self.x < enemy[0] + BLOCK_SIZE and self.x + BLOCK_SIZE > enemy[0] and
+                    self.y < enemy[1] + BLOCK_SIZE and self.y + BLOCK_SIZE > enemy[1]):
+                if self.lose_life():
+                    return True
+        return False
+
+    def step_swarm(self):
+        # Same rules as step_enemies: the first enemy on the head sends it to the spawn
+        # point, and every later enemy is then tested against the spawn point instead
+        # (with no grace period to cover it).
+        swarm = self.swarm
+        swarm.update()
+        if self.grace:
+            return False
+        hits = swarm.overlapping(self.x, self.y)
+        if not hits:
+            return False
+        if self.lose_life():
+            return True
+        if self.grace:
+            return False
+        for enemy in swarm.overlapping(SPAWN_X, SPAWN_Y):
+            if enemy > hits[0] and self.lose_life():
+                return True
+        return False
+
+    def fast_forward(self, ticks, policy=None):
+        """Step up to `ticks` times as fast as possible; policy(core) picks each action."""
+        for _ in range(ticks):
+            if self.step(policy(self) if policy else None) != RUNNING:
+                break
+        return self.status
+
+# -------------------------
+# Simple Policies
+# -------------------------
+def random_turn_policy(turn_chance=0.1, seed=None):
+    rng = random.Random(seed)
+    actions = (LEFT, RIGHT, UP, DOWN)
+    def policy(core):
+        if core.x_change == 0 and core.y_change == 0 or rng.random() < turn_chance:
+            return rng.choice(actions)
+        return None
+    return policy
+
+def greedy_food_policy(core):
+    # Heads straight for the food, horizontal first; ignores enemies.
+    if core.x < core.food_x:
+        return RIGHT
+    if core.x > core.food_x:
+        return LEFT
+    if core.y < core.food_y:
+        return DOWN
+    if core.y > core.food_y:
+        return UP
+    return None
+
+# -------------------------
+# Command Line: Headless Fast-Forward
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Run Bloody Demon Mode headless as fast as possible.")
+    parser.add_argument("--ticks", type=int, default=1000000, help="total ticks to simulate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enemies", type=int, help="enemy count (overrides --difficulty)")
+    parser.add_argument("--difficulty", choices=DIFFICULTY_ENEMIES, default="normal")
+    parser.add_argument("--policy", choices=("random", "greedy", "idle"), default="random")
+    args = parser.parse_args()
+    num_enemies = args.enemies if args.enemies is not None else DIFFICULTY_ENEMIES[args.difficulty]
+    grace_ticks = DIFFICULTY_GRACE_TICKS[args.difficulty]
+
+    policy = {"random": random_turn_policy(seed=args.seed), "greedy": greedy_food_policy, "idle": None}[args.policy]
+    seed = args.seed
+    outcomes = {LOST: 0, WON: 0, RUNNING: 0}
+    remaining = args.ticks
+    start = time.perf_counter()
+    while remaining > 0:
+        core = DemonCore(seed=seed, num_enemies=num_enemies, grace_ticks=grace_ticks)
+        outcomes[core.fast_forward(remaining, policy)] += 1
+        remaining -= core.ticks
+        seed += 1
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {elapsed:.2f}s ({args.ticks / elapsed:,.0f} ticks/sec)")
+    print(f"Games: {sum(outcomes.values())}  lost: {outcomes[LOST]}  won: {outcomes[WON]}  unfinished: {outcomes[RUNNING]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+import time
+import argparse
+import numpy as np
+
+from demon_core import (DemonCore, WIDTH, HEIGHT, BLOCK_SIZE, COLS, ROWS, SPAWN_X, SPAWN_Y, ENEMY_SPEEDS,
+                        LEFT, RIGHT, UP, DOWN, RUNNING, LOST, WON)
+
+# -------------------------
+# Batched Bloody Demon Mode (struct-of-arrays, NumPy)
+# -------------------------
+NOOP = -1
+ACTIONS = (LEFT, RIGHT, UP, DOWN)  # Action i in a step() array means ACTIONS[i]
+ACTION_DX = np.array([-BLOCK_SIZE, BLOCK_SIZE, 0, 0, 0], dtype=np.int32)  # Last slot is NOOP
+ACTION_DY = np.array([0, 0, -BLOCK_SIZE, BLOCK_SIZE, 0], dtype=np.int32)
+
+OUTCOME_RUNNING, OUTCOME_LOST, OUTCOME_WON = 0, 1, 2
+
+class DemonVecEnv:
+    """
+    N independent Bloody Demon Mode games advanced together with one step() call.
+    Every piece of state is an array with the game index first. The snake body is a
+    ring buffer per game (oldest segment at body_tail) with a per-cell occupancy count
+    for O(1) self-collision and free-cell food placement. The rules follow DemonCore
+    tick for tick, including the order of the life-loss checks. Games that end are
+    recorded and reset automatically.
+    """
+
+    def __init__(self, num_games, num_enemies=6, lives=3, target_score=1500, seed=None, grace_ticks=0):
+        self.n = num_games
+        self.num_enemies = num_enemies
+        self.grace_ticks = grace_ticks
+        self.start_lives = lives
+        self.target_score = target_score
+        self.rng = np.random.default_rng(seed)
+        # The snake can only grow once per 100 points, so this is the longest it gets.
+        self.capacity = target_score // 100 + 2
+
+        n, e, cap = num_games, num_enemies, self.capacity
+        self.head_x = np.empty(n, dtype=np.int32)
+        self.head_y = np.empty(n, dtype=np.int32)
+        self.dx = np.empty(n, dtype=np.int32)
+        self.dy = np.empty(n, dtype=np.int32)
+        self.body_x = np.zeros((n, cap), dtype=np.int32)
+        self.body_y = np.zeros((n, cap), dtype=np.int32)
+        self.body_tail = np.zeros(n, dtype=np.int32)
+        self.body_count = np.zeros(n, dtype=np.int32)
+        self.occupancy = np.zeros((n, COLS * ROWS), dtype=np.uint16)
+        self.snake_length = np.empty(n, dtype=np.int32)
+        self.food_x = np.empty(n, dtype=np.int32)
+        self.food_y = np.empty(n, dtype=np.int32)
+        self.enemy_x = np.empty((n, e), dtype=np.int32)
+        self.enemy_y = np.empty((n, e), dtype=np.int32)
+        self.enemy_vx = np.empty((n, e), dtype=np.int32)
+        self.enemy_vy = np.empty((n, e), dtype=np.int32)
+        self.lives = np.empty(n, dtype=np.int32)
+        self.grace = np.zeros(n, dtype=np.int32)  # Ticks left in which enemies cannot hit
+        self.score = np.empty(n, dtype=np.int32)
+        self.ticks = np.empty(n, dtype=np.int64)
+        self.outcome = np.zeros(n, dtype=np.int8)  # How each game's last step ended
+
+        self.episodes = 0
+        self.wins = 0
+        self.losses = 0
+        self.total_steps = 0
+        self.reset()
+
+    # -------------------------
+    # Resets
+    # -------------------------
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        idx = np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        self.lives[idx] = self.start_lives
+        self.score[idx] = 0
+        self.ticks[idx] = 0
+        self.respawn_snake(idx)
+        self.food_x[idx], self.food_y[idx] = self.random_food(idx)
+        self.spawn_enemies(idx)
+
+    def respawn_snake(self, idx):
+        self.head_x[idx] = SPAWN_X
+        self.head_y[idx] = SPAWN_Y
+        self.dx[idx] = 0
+        self.dy[idx] = 0
+        self.body_count[idx] = 0
+        self.occupancy[idx] = 0
+        self.snake_length[idx] = 1
+        self.grace[idx] = self.grace_ticks
+
+    def random_food(self, idx):
+        # Uniform over each game's empty cells, like DemonCore.random_food. The snake
+        # covers at most `capacity` of the 1200 cells, so redrawing the few that land
+        # on it converges in a pass or two.
+        cells = self.rng.integers(0, COLS * ROWS, idx.size)
+        taken = self.occupancy[idx, cells] > 0
+        while taken.any():
+            cells[taken] = self.rng.integers(0, COLS * ROWS, int(taken.sum()))
+            taken = self.occupancy[idx, cells] > 0
+        return (cells % COLS * BLOCK_SIZE).astype(np.int32), (cells // COLS * BLOCK_SIZE).astype(np.int32)
+
+    def spawn_enemies(self, idx):
+        shape = (idx.size, self.num_enemies)
+        speeds = np.array(ENEMY_SPEEDS, dtype=np.int32)
+        self.enemy_x[idx] = self.rng.integers(0, WIDTH - BLOCK_SIZE, shape)
+        self.enemy_y[idx] = self.rng.integers(0, HEIGHT - BLOCK_SIZE, shape)
+        self.enemy_vx[idx] = speeds[self.rng.integers(0, len(speeds), shape)]
+        self.enemy_vy[idx] = speeds[self.rng.integers(0, len(speeds), shape)]
+
+    # -------------------------
+    # One Tick for Every Game
+    # -------------------------
+    def step(self, actions=None):
+        """
+        actions: int array of length N with an index into ACTIONS, or NOOP.
+        Returns a bool array of the games that ended this step (see self.outcome).
+        """
+        n = self.n
+        self.ticks += 1
+        self.total_steps += n
+        np.maximum(self.grace - 1, 0, out=self.grace)
+        if actions is not None:
+            actions = np.asarray(actions)
+            turning = actions != NOOP
+            self.dx = np.where(turning, ACTION_DX[actions], self.dx)
+            self.dy = np.where(turning, ACTION_DY[actions], self.dy)
+
+        self.head_x += self.dx
+        self.head_y += self.dy
+        lost = np.zeros(n, dtype=bool)
+
+        # Check collision with boundaries; survivors respawn along with their enemies.
+        wall = ((self.head_x >= WIDTH) | (self.head_x < 0) |
+                (self.head_y >= HEIGHT) | (self.head_y < 0))
+        if wall.any():
+            self.lives -= wall
+            lost |= wall & (self.lives <= 0)
+            respawn = np.flatnonzero(wall & ~lost)
+            self.respawn_snake(respawn)
+            self.spawn_enemies(respawn)
+
+        # Append the head; drop the tail once the snake is longer than snake_length.
+        # Games that just lost have their head off the board, so they sit this out.
+        alive = np.flatnonzero(~lost)
+        cap = self.capacity
+        head_x, head_y = self.head_x[alive], self.head_y[alive]
+        head_cell = head_y // BLOCK_SIZE * COLS + head_x // BLOCK_SIZE
+        slot = (self.body_tail[alive] + self.body_count[alive]) % cap
+        self.body_x[alive, slot] = head_x
+        self.body_y[alive, slot] = head_y
+        self.occupancy[alive, head_cell] += 1
+        full = alive[self.body_count[alive] >= self.snake_length[alive]]
+        tail = self.body_tail[full]
+        tail_cell = self.body_y[full, tail] // BLOCK_SIZE * COLS + self.body_x[full, tail] // BLOCK_SIZE
+        self.occupancy[full, tail_cell] -= 1
+        self.body_tail[full] = (tail + 1) % cap
+        self.body_count[alive] += 1
+        self.body_count[full] -= 1
+
+        # Check self-collision; every older segment on the head's cell costs a life.
+        hits = np.zeros(n, dtype=np.int32)
+        hits[alive] = self.occupancy[alive, head_cell].astype(np.int32) - 1
+        self.apply_hits(hits, lost)
+
+        # Move enemies and bounce them at the bounds.
+        self.enemy_x += self.enemy_vx
+        self.enemy_y += self.enemy_vy
+        edge_x = WIDTH - BLOCK_SIZE
+        edge_y = HEIGHT - BLOCK_SIZE
+        self.enemy_vx = np.where((self.enemy_x <= 0) | (self.enemy_x >= edge_x), -self.enemy_vx, self.enemy_vx)
+        self.enemy_vy = np.where((self.enemy_y <= 0) | (self.enemy_y >= edge_y), -self.enemy_vy, self.enemy_vy)
+
+        # Enemies are tested in order and the first hit moves the head to the spawn
+        # point, so every later enemy is tested against the spawn point instead. With
+        # grace_ticks the grace period starting there covers those, and games still in
+        # grace (or that respawned earlier this tick) take no enemy hits at all.
+        hit_head = self.overlaps(self.head_x[:, None], self.head_y[:, None]) & (self.grace == 0)[:, None]
+        first = np.where(hit_head.any(axis=1), hit_head.argmax(axis=1), self.num_enemies)
+        hits = (first < self.num_enemies).astype(np.int32)
+        if self.grace_ticks == 0:
+            hit_spawn = self.overlaps(SPAWN_X, SPAWN_Y)
+            after_first = np.arange(self.num_enemies) > first[:, None]
+            hits += (hit_spawn & after_first).sum(axis=1, dtype=np.int32)
+        self.apply_hits(hits * ~lost, lost)
+
+        # Check if snake eats the food.
+        eat = ~lost & (self.head_x == self.food_x) & (self.head_y == self.food_y)
+        if eat.any():
+            eaters = np.flatnonzero(eat)
+            self.food_x[eaters], self.food_y[eaters] = self.random_food(eaters)
+            self.snake_length[eaters] += 1
+            self.score[eaters] += 100
+
+        won = ~lost & (self.score >= self.target_score)
+        done = lost | won
+        self.outcome[:] = OUTCOME_RUNNING
+        self.outcome[lost] = OUTCOME_LOST
+        self.outcome[won] = OUTCOME_WON
+        if done.any():
+            self.episodes += int(done.sum())
+            self.losses += int(lost.sum())
+            self.wins += int(won.sum())
+            self.reset(done)
+        return done
+
+    def overlaps(self, x, y):
+        return ((x < self.enemy_x + BLOCK_SIZE) & (x + BLOCK_SIZE > self.enemy_x) &
+                (y < self.enemy_y + BLOCK_SIZE) & (y + BLOCK_SIZE > self.enemy_y))
+
+    def apply_hits(self, hits, lost):
+        # Takes the lives; games still alive respawn at the spawn point (enemies stay).
+        hit = hits > 0
+        if not hit.any():
+            return
+        self.lives -= hits
+        lost |= hit & (self.lives <= 0)
+        self.respawn_snake(np.flatnonzero(hit & ~lost))
+
+    # -------------------------
+    # Interop with DemonCore
+    # -------------------------
+    def load_core(self, i, core):
+        """Copy one DemonCore's state into game i (used by the parity check)."""
+        self.head_x[i], self.head_y[i] = core.x, core.y
+        self.dx[i], self.dy[i] = core.x_change, core.y_change
+        self.body_tail[i] = 0
+        self.body_count[i] = len(core.snake)
+        self.occupancy[i] = 0
+        for j, (seg_x, seg_y) in enumerate(core.snake_list):
+            self.body_x[i, j], self.body_y[i, j] = seg_x, seg_y
+            self.occupancy[i, seg_y // BLOCK_SIZE * COLS + seg_x // BLOCK_SIZE] += 1
+        self.snake_length[i] = core.snake_length
+        self.food_x[i], self.food_y[i] = core.food_x, core.food_y
+        for j, (enemy_x, enemy_y, enemy_vx, enemy_vy) in enumerate(core.enemies):
+            self.enemy_x[i, j], self.enemy_y[i, j] = enemy_x, enemy_y
+            self.enemy_vx[i, j], self.enemy_vy[i, j] = enemy_vx, enemy_vy
+        self.lives[i], self.score[i] = core.lives, core.score
+        self.grace[i] = core.grace
+
+    def snake_of(self, i):
+        cap = self.capacity
+        tail = int(self.body_tail[i])
+        return [[int(self.body_x[i, (tail + j) % cap]), int(self.body_y[i, (tail + j) % cap])]
+                for j in range(int(self.body_count[i]))]
+
+# -------------------------
+# Parity Check and Benchmark
+# -------------------------
+def check_parity(num_games=64, ticks=2000, seed=0, grace_ticks=0):
+    """
+    Steps DemonCores and a DemonVecEnv side by side with the same actions and compares
+    them after every tick. Each game is re-synced from its core after every tick, and
+    ticks where the core respawned its enemies are skipped, since the two draw them
+    from different RNGs. Returns the number of mismatching (game, tick) pairs.
+    """
+    rng = np.random.default_rng(seed)
+    cores = [DemonCore(seed=seed + i, grace_ticks=grace_ticks) for i in range(num_games)]
+    env = DemonVecEnv(num_games, seed=seed, grace_ticks=grace_ticks)
+    for i, core in enumerate(cores):
+        env.load_core(i, core)
+    outcomes = {RUNNING: OUTCOME_RUNNING, LOST: OUTCOME_LOST, WON: OUTCOME_WON}
+    mismatches = 0
+    for _ in range(ticks):
+        actions = np.where(rng.random(num_games) < 0.15, rng.integers(0, 4, num_games), NOOP)
+        enemies_before = [core.enemies for core in cores]
+        env.step(actions)
+        for i, core in enumerate(cores):
+            status = core.step(ACTIONS[actions[i]] if actions[i] != NOOP else None)
+            if core.enemies is enemies_before[i]:
+                same = env.outcome[i] == outcomes[status]
+                if status == RUNNING:
+                    enemies = np.stack([env.enemy_x[i], env.enemy_y[i], env.enemy_vx[i], env.enemy_vy[i]], 1)
+                    same = (same and env.snake_of(i) == core.snake_list and
+                            int(env.lives[i]) == core.lives and int(env.score[i]) == core.score and
+                            int(env.grace[i]) == core.grace and
+                            enemies.tolist() == core.enemies)
+                mismatches += not same
+            if status != RUNNING:
+                cores[i] = core = DemonCore(seed=int(rng.integers(1 << 31)), grace_ticks=grace_ticks)
+            env.load_core(i, core)
+    return mismatches
+
+def benchmark(num_games, steps, num_enemies=6, seed=0):
+    env = DemonVecEnv(num_games, num_enemies=num_enemies, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    actions = np.where(rng.random((steps, num_games)) < 0.1, rng.integers(0, 4, (steps, num_games)), NOOP)
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    elapsed = time.perf_counter() - start
+    return env, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched Bloody Demon Mode environment.")
+    parser.add_argument("--games", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--enemies", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="compare against DemonCore instead of benchmarking")
+    args = parser.parse_args()
+
+    if args.check:
+        # Once with the original rules and once with a spawn grace period, as the harder tiers use.
+        failed = False
+        for grace_ticks in (0, 15):
+            mismatches = check_parity(seed=args.seed, grace_ticks=grace_ticks)
+            print(f"Parity with DemonCore, grace {grace_ticks} ticks: " +
+                  ("OK" if mismatches == 0 else f"{mismatches} mismatches"))
+            failed = failed or mismatches
+        raise SystemExit(1 if failed else 0)
+
+    env, elapsed = benchmark(args.games, args.steps, args.enemies, args.seed)
+    rate = args.games * args.steps / elapsed
+    print(f"{args.games} games x {args.steps} steps in {elapsed:.2f}s ({rate:,.0f} game-steps/sec)")
+    print(f"Episodes finished: {env.episodes}  won: {env.wins}  lost: {env.losses}")
+
+if __name__ == "__main__":
+    main()
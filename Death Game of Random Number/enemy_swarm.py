@@ -0,0 +1,142 @@
+import os
+import time
+import argparse
+import numpy as np
+
+# -------------------------
+# Vectorized Enemy Swarm
+# -------------------------
+class EnemySwarm:
+    """
+    Enemies as contiguous int32 arrays (x, y, vx, vy), moved and bounced in one
+    vectorized pass. overlapping() tests a box against the whole swarm in one pass too.
+    With only the snake head and the spawn point to test each tick, that beat a grid
+    broadphase at every enemy count we measured (see benchmark()).
+    """
+
+    def __init__(self, count, rng, width, height, size, speeds):
+        self.count = count
+        self.rng = rng  # numpy Generator
+        self.width = width
+        self.height = height
+        self.size = size
+        self.speeds = np.array(speeds, dtype=np.int32)
+        self.spawn()
+
+    def spawn(self):
+        count = self.count
+        self.x = self.rng.integers(0, self.width - self.size, count, dtype=np.int32)
+        self.y = self.rng.integers(0, self.height - self.size, count, dtype=np.int32)
+        self.vx = self.speeds[self.rng.integers(0, len(self.speeds), count)]
+        self.vy = self.speeds[self.rng.integers(0, len(self.speeds), count)]
+
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        np.negative(self.vx, out=self.vx, where=(self.x <= 0) | (self.x >= self.width - self.size))
+        np.negative(self.vy, out=self.vy, where=(self.y <= 0) | (self.y >= self.height - self.size))
+
+    def overlapping(self, x, y):
+        """Indices (ascending) of enemies whose box overlaps the size x size box at (x, y)."""
+        size = self.size
+        hit = (np.abs(self.x - x) < size) & (np.abs(self.y - y) < size)
+        return np.flatnonzero(hit).tolist()
+
+    def positions(self):
+        return zip(self.x.tolist(), self.y.tolist())
+
+# -------------------------
+# Benchmark: Frame Time vs Enemy Count
+# -------------------------
+class GridBroadphase:
+    """
+    Uniform-grid broadphase over a swarm, kept here for comparison: enemies are sorted by
+    cell key and a query only checks the 3x3 cells around the box.
+    """
+
+    def __init__(self, swarm):
+        size = swarm.size
+        self.swarm = swarm
+        # Enemies can overshoot 0 by one step before bouncing, so pad the grid by a cell.
+        self.grid_cols = swarm.width // size + 3
+        self.row_offsets = np.array((-self.grid_cols, 0, self.grid_cols))
+        keys = self.cell_key(swarm.x, swarm.y).astype(np.int16)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def cell_key(self, x, y):
+        size = self.swarm.size
+        return (y + size) // size * self.grid_cols + (x + size) // size
+
+    def overlapping(self, x, y):
+        rows = int(self.cell_key(x, y)) + self.row_offsets
+        starts = np.searchsorted(self.sorted_keys, rows - 1, side="left").tolist()
+        ends = np.searchsorted(self.sorted_keys, rows + 1, side="right").tolist()
+        spans = [self.order[start:end] for start, end in zip(starts, ends) if end > start]
+        if not spans:
+            return []
+        swarm = self.swarm
+        candidates = np.concatenate(spans)
+        hit = ((np.abs(swarm.x[candidates] - x) < swarm.size) &
+               (np.abs(swarm.y[candidates] - y) < swarm.size))
+        return np.sort(candidates[hit]).tolist()
+
+def benchmark(counts, ticks=300, seed=0):
+    """
+    Times one Bloody Demon Mode frame's enemy work at each count: the vectorized update,
+    the vectorized collision tests against the head and the spawn point, the same tests
+    through a freshly built GridBroadphase, and one batched blits() draw.
+    Results are microseconds per frame.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from demon_core import WIDTH, HEIGHT, BLOCK_SIZE, ENEMY_SPEEDS, SPAWN_X, SPAWN_Y
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    sprite = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE)).convert()
+    sprite.fill((255, 0, 0))
+    sprite.fill((0, 0, 0), (5, 5, 5, 5))
+
+    rows = []
+    for count in counts:
+        swarm = EnemySwarm(count, np.random.default_rng(seed), WIDTH, HEIGHT, BLOCK_SIZE, ENEMY_SPEEDS)
+        timings = {"update": 0.0, "collide": 0.0, "grid": 0.0, "draw": 0.0}
+        for tick in range(ticks):
+            head_x, head_y = tick * BLOCK_SIZE % WIDTH, SPAWN_Y
+            t0 = time.perf_counter()
+            swarm.update()
+            t1 = time.perf_counter()
+            hits = swarm.overlapping(head_x, head_y) + swarm.overlapping(SPAWN_X, SPAWN_Y)
+            t2 = time.perf_counter()
+            grid = GridBroadphase(swarm)
+            grid_hits = grid.overlapping(head_x, head_y) + grid.overlapping(SPAWN_X, SPAWN_Y)
+            t3 = time.perf_counter()
+            screen.blits([(sprite, position) for position in swarm.positions()], False)
+            t4 = time.perf_counter()
+            assert hits == grid_hits
+            timings["update"] += t1 - t0
+            timings["collide"] += t2 - t1
+            timings["grid"] += t3 - t2
+            timings["draw"] += t4 - t3
+        row = {name: total / ticks * 1e6 for name, total in timings.items()}
+        row["count"] = count
+        row["frame_ms"] = (row["update"] + row["collide"] + row["draw"]) / 1000
+        rows.append(row)
+    pygame.display.quit()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame time of the enemy swarm against enemy count.")
+    parser.add_argument("--counts", default="6,60,600,3000,10000")
+    parser.add_argument("--ticks", type=int, default=300)
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.counts.split(",")]
+    print(f"{'enemies':>8} {'update us':>10} {'collide us':>11} {'grid us':>9} {'draw us':>9} {'frame ms':>9}")
+    for row in benchmark(counts, args.ticks):
+        print(f"{row['count']:>8} {row['update']:>10.1f} {row['collide']:>11.1f} {row['grid']:>9.1f} "
+              f"{row['draw']:>9.1f} {row['frame_ms']:>9.3f}")
+
+if __name__ == "__main__":
+    main()
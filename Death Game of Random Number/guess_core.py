@@ -0,0 +1,49 @@
+import random
+from datetime import timedelta
+
+# -------------------------
+# Guessing Game Rules (no pygame needed)
+# -------------------------
+LOWEST, HIGHEST = 1, 666
+MAX_ATTEMPTS = 10
+MAX_DAYS_LEFT = 666  # The death date is 1 to this many days after the game ends
+
+PLAYING, HELL, GAME_OVER = "playing", "hell", "game_over"
+
+class GuessSession:
+    """
+    One player's game: a number from LOWEST to HIGHEST and MAX_ATTEMPTS wrong guesses
+    before it is over. Guessing right sends you to hell; running out gives you a death
+    date. All randomness comes from the session's own seeded RNG, so a seed always
+    replays the same game. py.py draws it and guess_server.py serves it to terminals.
+    """
+
+    def __init__(self, seed=None, max_attempts=MAX_ATTEMPTS):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.max_attempts = max_attempts
+        self.target = self.rng.randint(LOWEST, HIGHEST)
+        self.attempts = 0
+        self.outcome = PLAYING
+        self.death = None  # The death date, once there is one
+
+    def attempts_left(self):
+        return self.max_attempts - self.attempts
+
+    def guess(self, number):
+        """Plays one guess and returns the outcome: still PLAYING, HELL or GAME_OVER."""
+        if self.outcome != PLAYING:
+            return self.outcome
+        if number == self.target:
+            self.outcome = HELL
+        else:
+            self.attempts += 1
+            if self.attempts >= self.max_attempts:
+                self.outcome = GAME_OVER
+        return self.outcome
+
+    def death_date(self, now):
+        # Drawn once per session, counted from `now` (a datetime) the first time it is asked.
+        if self.death is None:
+            self.death = now + timedelta(days=self.rng.randint(1, MAX_DAYS_LEFT))
+        return self.death.strftime("%d %B %Y, %H:%M:%S")
@@ -0,0 +1,210 @@
+import sys
+import time
+import random
+import asyncio
+import argparse
+import itertools
+from datetime import datetime
+from guess_core import GuessSession, PLAYING, HELL, GAME_OVER, LOWEST, HIGHEST
+from profiler import percentile
+
+# -------------------------
+# Line Protocol
+# -------------------------
+# One session per connection. Every message is one line of ASCII.
+#   server: READY <session id> <attempts left>    on connect, and after NEW
+#   client: GUESS <n>
+#   server: WRONG <attempts left> | HELL | DEAD <death date> | BAD <reason>
+#   client: NEW        a fresh game on the same connection
+#   client: QUIT       server answers BYE and hangs up
+#   server: EVICTED    the session sat idle too long; the server hangs up
+MAX_LINE = 64
+
+def raise_file_limit():
+    # Thousands of sockets need more descriptors than the usual soft limit of 1024.
+    try:
+        import resource
+    except ImportError:
+        return  # Not available on Windows
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+# -------------------------
+# Multi-Session Server
+# -------------------------
+class GuessServer:
+    """
+    Hosts one GuessSession per connected terminal on a single asyncio loop. Each
+    session's RNG is seeded from the server's own, so a server started with --seed
+    deals the same games in the same order. A sweeper hangs up on sessions that have
+    not sent a line for idle_timeout seconds.
+    """
+
+    def __init__(self, seed=None, idle_timeout=300.0, max_attempts=10):
+        self.rng = random.Random(seed)
+        self.idle_timeout = idle_timeout
+        self.max_attempts = max_attempts
+        self.ids = itertools.count(1)
+        self.clients = {}  # session id -> [session, writer, last activity (loop time)]
+        self.started = 0
+        self.evicted = 0
+
+    def new_session(self):
+        self.started += 1
+        return GuessSession(seed=self.rng.getrandbits(64), max_attempts=self.max_attempts)
+
+    def answer(self, session, line):
+        """The reply to one client line, and whether to hang up after it."""
+        command, _, argument = line.strip().partition(" ")
+        command = command.upper()
+        if command == "GUESS":
+            if session.outcome != PLAYING:
+                return "BAD game is over, send NEW", False
+            try:
+                number = int(argument)
+            except ValueError:
+                number = None
+            # Range checking is part of the protocol: a BAD guess costs no attempt. The
+            # pygame game keeps its own rule and counts any number as a guess.
+            if number is None or not LOWEST <= number <= HIGHEST:
+                return f"BAD not a number from {LOWEST} to {HIGHEST}", False
+            outcome = session.guess(number)
+            if outcome == HELL:
+                return "HELL", False
+            if outcome == GAME_OVER:
+                return "DEAD " + session.death_date(datetime.now()), False
+            return f"WRONG {session.attempts_left()}", False
+        if command == "QUIT":
+            return "BYE", True
+        return "BAD unknown command", False
+
+    async def handle(self, reader, writer):
+        session_id = next(self.ids)
+        loop = asyncio.get_running_loop()
+        client = self.clients[session_id] = [self.new_session(), writer, loop.time()]
+        writer.write(f"READY {session_id} {self.max_attempts}\n".encode())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                client[2] = loop.time()
+                if len(line) > MAX_LINE:
+                    reply, done = "BAD line too long", True
+                elif line.strip().upper() == b"NEW":
+                    client[0] = self.new_session()
+                    reply, done = f"READY {session_id} {self.max_attempts}", False
+                else:
+                    reply, done = self.answer(client[0], line.decode("ascii", "replace"))
+                writer.write(reply.encode() + b"\n")
+                if done:
+                    break
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass  # The client went away, or sent a line the stream buffer cannot hold
+        finally:
+            self.clients.pop(session_id, None)
+            writer.close()
+
+    async def sweep(self):
+        # Checks a few times per timeout, so no idle session outlives it by much.
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            cutoff = loop.time() - self.idle_timeout
+            for session_id, (_, writer, last) in list(self.clients.items()):
+                if last < cutoff:
+                    del self.clients[session_id]
+                    self.evicted += 1
+                    writer.write(b"EVICTED\n")
+                    writer.close()
+
+    async def serve(self, host=None, port=None, path=None):
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path, backlog=4096)
+            where = path
+        else:
+            server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+            where = f"{host}:{port}"
+        print(f"Serving the guessing game on {where}", flush=True)
+        sweeper = asyncio.ensure_future(self.sweep())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+            print(f"{self.started} sessions, {len(self.clients)} open, {self.evicted} evicted")
+
+# -------------------------
+# Load Test Client
+# -------------------------
+async def connect(host, port, path):
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+async def play_games(host, port, path, games, latencies, rng):
+    # One terminal: plays `games` games back to back, guessing blindly like a player would.
+    reader, writer = await connect(host, port, path)
+    await reader.readline()  # READY
+    finished = 0
+    while finished < games:
+        sent = time.perf_counter()
+        writer.write(f"GUESS {rng.randint(LOWEST, HIGHEST)}\n".encode())
+        reply = await reader.readline()
+        latencies.append(time.perf_counter() - sent)
+        if not reply or reply.startswith(b"EVICTED"):
+            break
+        if reply.startswith((b"HELL", b"DEAD")):
+            finished += 1
+            writer.write(b"NEW\n")
+            await reader.readline()
+    writer.write(b"QUIT\n")
+    await reader.readline()
+    writer.close()
+    return finished
+
+async def load_test(host, port, path, clients, games, seed=0):
+    latencies = []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_games(host, port, path, games, latencies, random.Random(rng.random()))
+                                     for _ in range(clients)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    finished = sum(result for result in results if isinstance(result, int))
+    failed = sum(1 for result in results if isinstance(result, BaseException))
+    latencies.sort()
+    print(f"{clients} concurrent terminals, {finished} games ({len(latencies)} guesses) in {elapsed:.2f} s, "
+          f"{failed} connections failed")
+    print(f"{finished / elapsed:.0f} sessions/s, {len(latencies) / elapsed:.0f} guesses/s")
+    print("guess round trip: " + ", ".join(f"p{int(fraction * 100)} {percentile(latencies, fraction) * 1000:.2f} ms"
+                                          for fraction in (0.5, 0.9, 0.99)))
+
+# -------------------------
+# Command Line
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Serve the guessing game to many terminals, or load-test a server.")
+    parser.add_argument("mode", choices=("serve", "load"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6666)
+    parser.add_argument("--unix", default=None, metavar="PATH", help="use a Unix socket instead of TCP")
+    parser.add_argument("--seed", type=int, default=None, help="serve: seed for the sessions' RNGs")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="serve: seconds before an idle session is dropped")
+    parser.add_argument("--clients", type=int, default=1000, help="load: concurrent terminals")
+    parser.add_argument("--games", type=int, default=5, help="load: games each terminal plays")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    try:
+        if args.mode == "serve":
+            server = GuessServer(seed=args.seed, idle_timeout=args.idle_timeout)
+            asyncio.run(server.serve(args.host, args.port, args.unix))
+        else:
+            asyncio.run(load_test(args.host, args.port, args.unix, args.clients, args.games))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import os
+import time
+from bisect import bisect_left
+
+# -------------------------
+# Input-to-Display Latency
+# -------------------------
+# Histogram buckets: upper bounds in ms, a quarter octave apart (each ~19% wider than
+# the last), from 0.25 ms to about 4 s. Anything slower lands in one overflow bucket.
+BOUNDS_MS = tuple(0.25 * 2 ** (i / 4) for i in range(57))
+
+class NullLatency:
+    """What the game uses when latency tracking is off: every call is an empty method."""
+
+    enabled = False
+
+    def input(self, scene, kind, stamp):
+        pass
+
+    def shown(self, screen=None):
+        pass
+
+class LatencyTracker:
+    """
+    Times each input from the moment it arrives to the present() that first shows its
+    effect, per scene and input kind. The scene loop calls input() for each key or click
+    it hands a scene; a scene whose input takes effect later (Hard Time turns wait for
+    the next step) calls input() itself when it does. shown() is hooked to
+    Renderer.after_present and closes everything pending. Only bucket counts are kept,
+    so memory stays fixed and recording is an append and a bisect.
+    SDL's own event timestamps are not exposed by pygame, so `stamp` is when the loop
+    received the event, or event.posted_at for injected events (bench.py
+    --input-latency), which then also counts the time the event sat in the queue.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.pending = []      # (scene, kind, stamp) not on screen yet
+        self.histograms = {}   # (scene, kind) -> bucket counts, len(BOUNDS_MS) + 1
+        self.totals = {}       # (scene, kind) -> [count, sum ms, max ms]
+
+    def input(self, scene, kind, stamp):
+        self.pending.append((scene, kind, stamp))
+
+    def shown(self, screen=None):
+        if not self.pending:
+            return
+        now = time.perf_counter()
+        for scene, kind, stamp in self.pending:
+            self.record(scene, kind, (now - stamp) * 1000)
+        self.pending.clear()
+
+    def record(self, scene, kind, ms):
+        key = (scene, kind)
+        counts = self.histograms.get(key)
+        if counts is None:
+            counts = self.histograms[key] = [0] * (len(BOUNDS_MS) + 1)
+            self.totals[key] = [0, 0.0, 0.0]
+        counts[bisect_left(BOUNDS_MS, ms)] += 1
+        totals = self.totals[key]
+        totals[0] += 1
+        totals[1] += ms
+        totals[2] = max(totals[2], ms)
+
+    def percentile(self, scene, kind, fraction):
+        # The upper bound of the bucket holding that rank (so within ~19% above), never past the max.
+        counts = self.histograms.get((scene, kind))
+        if counts is None:
+            return 0.0
+        total, _, worst = self.totals[(scene, kind)]
+        rank = min(total, int(fraction * total) + 1)
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return min(BOUNDS_MS[bucket], worst) if bucket < len(BOUNDS_MS) else worst
+        return worst
+
+    def summary(self):
+        """Rows of (scene, kind, count, mean ms, p50 ms, p90 ms, p99 ms, max ms)."""
+        rows = []
+        for scene, kind in sorted(self.histograms):
+            count, total, worst = self.totals[(scene, kind)]
+            rows.append((scene, kind, count, total / count,
+                         *(self.percentile(scene, kind, fraction) for fraction in (0.5, 0.9, 0.99)), worst))
+        return rows
+
+    def print_summary(self):
+        print(f"{'scene':<10} {'input':<6} {'count':>6} {'mean ms':>8} {'p50 ms':>7} {'p90 ms':>7} "
+              f"{'p99 ms':>7} {'max ms':>7}")
+        for scene, kind, count, mean, p50, p90, p99, worst in self.summary():
+            print(f"{scene:<10} {kind:<6} {count:>6} {mean:>8.1f} {p50:>7.1f} {p90:>7.1f} {p99:>7.1f} {worst:>7.1f}")
+
+def latency_from_env():
+    """On unless DEVIL_LATENCY=0; it costs an append per input and a check per frame."""
+    if os.environ.get("DEVIL_LATENCY", "1") == "0":
+        return NullLatency()
+    return LatencyTracker()
@@ -0,0 +1,361 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from guess_core import LOWEST, HIGHEST, MAX_ATTEMPTS
+from scheduler import per_second_rate
+
+# -------------------------
+# Parameters
+# -------------------------
+# Times are game milliseconds, like the game's own timers. The trigger chances are per
+# tick at tick_rate, turned into exponential waits exactly as EventScheduler does. With
+# fps set, a timer is only noticed at the next frame of a loop polling at that rate
+# (DEVIL_IDLE=0); without it the idle loop wakes on the deadline itself.
+PLAYER_PARAMS = {
+    "strategy": "random",       # Blind guesses: "random" (may repeat) or "distinct" (never repeats)
+    "guess_seconds": 4.0,       # Mean time a player takes per guess...
+    "guess_shape": 2.0,         # ...gamma distributed with this shape (1 is exponential)
+    "guess_start_ms": 3000,     # Game time the guess screen comes up (after the warning)
+    "reaction_ms": 900.0,       # Median time to click ESCAPE once it shows (lognormal)...
+    "reaction_sigma": 0.6,      # ...with this sigma
+    "miss": 0.0,                # Chance a player never notices one showing of ESCAPE
+    "fps": None,
+}
+
+def game_params():
+    """The game's own trigger rules (read from py.py) plus the PLAYER_PARAMS defaults."""
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import py as game
+    params = {
+        "numbers": HIGHEST - LOWEST + 1,
+        "max_attempts": MAX_ATTEMPTS,
+        "tick_rate": game.NOMINAL_FPS,
+        "hint_chance": game.HINT_CHANCE,
+        "hint_cooldown_ms": game.hint_cooldown,
+        "hint_duration_ms": game.HINT_DURATION,
+        "dragon_chance": game.DRAGON_CHANCE,
+        "escape_chance": game.ESCAPE_BUTTON_CHANCE,
+        "escape_window_ms": game.ESCAPE_BUTTON_TIME,
+        "hell_duration_ms": game.HellScene.duration,
+    }
+    params.update(PLAYER_PARAMS)
+    return params
+
+# -------------------------
+# Simulated Sessions (one chunk of N at a time, all arrays)
+# -------------------------
+GUESS_OUTCOMES = ("hell", "game_over", "dragon")
+HELL, GAME_OVER, DRAGON = range(3)
+RESOLUTION_MS = 100   # Time histograms are kept at this resolution...
+MAX_MS = 3600 * 1000  # ...up to here, with everything later in one overflow bin
+TIME_BINS = MAX_MS // RESOLUTION_MS + 1
+MAX_COUNTED = 50      # Hint and ESCAPE showing counts past this share one bin
+NEVER = 2 ** 62       # The wait of a trigger whose chance is 0
+
+def waits(rng, chance, tick_rate, size):
+    # EventScheduler.after_chance for many sessions at once: whole ms, like int(... * 1000).
+    rate = per_second_rate(chance, tick_rate)
+    if rate == np.inf:
+        return np.zeros(size, np.int64)
+    if rate <= 0:
+        return np.full(size, NEVER, np.int64)
+    return np.floor(rng.exponential(1000.0 / rate, size)).astype(np.int64)
+
+def noticed(times, fps):
+    # When a loop polling at fps first sees a deadline: its next frame boundary.
+    if not fps:
+        return times
+    frame_ms = 1000.0 / fps
+    return (np.ceil(times / frame_ms) * frame_ms).astype(np.int64)
+
+def guesses_before(rng, guesses, total_ms, cutoff_ms, shape, max_attempts):
+    # How many of `guesses` gamma(shape) guess times, known to add up to total_ms, are done
+    # before cutoff_ms. Given their sum they split it Dirichlet(shape, ..., shape), which
+    # is drawn as gammas divided by their sum.
+    parts = rng.gamma(shape, 1.0, (guesses.size, max_attempts))
+    parts[np.arange(max_attempts) >= guesses[:, None]] = 0.0
+    done = np.cumsum(parts, axis=1) / parts.sum(axis=1, keepdims=True) * total_ms[:, None]
+    return (done < cutoff_ms[:, None]).sum(axis=1)
+
+def simulate_guessing(params, n, rng):
+    """
+    N sessions of the guess screen with blind guesses, from guess_start_ms until the
+    right number (hell), the last wrong guess (game over) or the dragon, whichever is
+    first. Returns per-session arrays: outcome, guesses made, ending time, hints shown
+    and the first hint's time (-1 for none).
+    """
+    numbers, max_attempts = params["numbers"], params["max_attempts"]
+    if params["strategy"] == "distinct":
+        hit_at = rng.integers(1, numbers + 1, n)  # Position of the target in a shuffled order
+    else:
+        hit_at = rng.geometric(1.0 / numbers, n)
+    guesses = np.minimum(hit_at, max_attempts)
+    outcome = np.where(hit_at <= max_attempts, HELL, GAME_OVER).astype(np.int8)
+    # The sum of k gamma(shape, scale) guess times is gamma(k * shape, scale).
+    shape = params["guess_shape"]
+    scale = params["guess_seconds"] * 1000.0 / shape
+    start = params["guess_start_ms"]
+    ending = start + rng.gamma(guesses * shape, scale).astype(np.int64)
+
+    tick_rate, fps = params["tick_rate"], params["fps"]
+    dragon = noticed(start + waits(rng, params["dragon_chance"], tick_rate, n), fps)
+    by_dragon = dragon < ending
+    outcome[by_dragon] = DRAGON
+    # The dragon cuts the session short: only the guesses made before it count.
+    guesses[by_dragon] = guesses_before(rng, guesses[by_dragon], ending[by_dragon] - start,
+                                        dragon[by_dragon] - start, shape, max_attempts)
+    ending = np.minimum(ending, dragon)
+
+    # Hints repeat until the ending. One that comes within hint_cooldown_ms of the last
+    # shown one (or of game start) is skipped; after one that shows, the next wait
+    # starts when it ends (GuessScene.update).
+    hints = np.zeros(n, np.int64)
+    first_hint = np.full(n, -1, np.int64)
+    last_shown = np.zeros(n, np.int64)
+    due = noticed(start + waits(rng, params["hint_chance"], tick_rate, n), fps)
+    live = np.flatnonzero(due < ending)
+    while live.size:
+        now = due[live]
+        shown = now - last_shown[live] > params["hint_cooldown_ms"]
+        shown_at = live[shown]
+        hints[shown_at] += 1
+        first_hint[shown_at] = np.where(first_hint[shown_at] < 0, now[shown], first_hint[shown_at])
+        last_shown[shown_at] = now[shown]
+        restart = np.where(shown, now + params["hint_duration_ms"] + 1, now)
+        due[live] = noticed(restart + waits(rng, params["hint_chance"], tick_rate, live.size), fps)
+        live = live[due[live] < ending[live]]
+    return {"outcome": outcome, "guesses": guesses, "ending": ending, "hints": hints, "first_hint": first_hint}
+
+def simulate_hell(params, n, rng):
+    """
+    N players in the hell ending, from the moment it starts. ESCAPE shows after a random
+    wait and stays up for escape_window_ms; a player who notices it clicks after a
+    lognormal reaction time, and escapes if that is still inside the window. Otherwise
+    the wait starts over when it hides, until hell_duration_ms runs out. Returns
+    per-session arrays: escaped, escape time (-1 for none) and showings seen.
+    """
+    window, duration = params["escape_window_ms"], params["hell_duration_ms"]
+    escaped = np.zeros(n, bool)
+    escape_at = np.full(n, -1, np.int64)
+    showings = np.zeros(n, np.int64)
+    shows = noticed(waits(rng, params["escape_chance"], params["tick_rate"], n), params["fps"])
+    live = np.flatnonzero(shows < duration)
+    reaction_mu = np.log(params["reaction_ms"])
+    while live.size:
+        now = shows[live]
+        showings[live] += 1
+        reaction = rng.lognormal(reaction_mu, params["reaction_sigma"], live.size)
+        clicked = (rng.random(live.size) >= params["miss"]) & (reaction <= window) & (now + reaction < duration)
+        escaped[live[clicked]] = True
+        escape_at[live[clicked]] = now[clicked] + reaction[clicked].astype(np.int64)
+        live = live[~clicked]
+        hidden = shows[live] + window + 1
+        shows[live] = noticed(hidden + waits(rng, params["escape_chance"], params["tick_rate"], live.size),
+                              params["fps"])
+        live = live[shows[live] < duration]
+    return {"escaped": escaped, "escape_at": escape_at, "showings": showings}
+
+def time_bins(ms):
+    return np.minimum(ms // RESOLUTION_MS, TIME_BINS - 1)
+
+def guessing_totals(params, n, seed):
+    # One pool task: simulate a chunk and keep only histograms, so little goes back to the parent.
+    sessions = simulate_guessing(params, n, np.random.default_rng(seed))
+    outcome, hints = sessions["outcome"], sessions["hints"]
+    by_outcome = np.stack([np.bincount(time_bins(sessions["ending"][outcome == code]), minlength=TIME_BINS)
+                           for code in range(len(GUESS_OUTCOMES))])
+    guesses = np.stack([np.bincount(sessions["guesses"][outcome == code], minlength=params["max_attempts"] + 1)
+                        for code in range(len(GUESS_OUTCOMES))])
+    first_hint = sessions["first_hint"]
+    return {
+        "sessions": n,
+        "ending_ms": by_outcome,
+        "guesses": guesses,
+        "hints": np.bincount(np.minimum(hints, MAX_COUNTED), minlength=MAX_COUNTED + 1),
+        "first_hint_ms": np.bincount(time_bins(first_hint[first_hint >= 0]), minlength=TIME_BINS),
+    }
+
+def hell_totals(params, n, seed):
+    sessions = simulate_hell(params, n, np.random.default_rng(seed))
+    escaped = sessions["escaped"]
+    return {
+        "sessions": n,
+        "escape_ms": np.bincount(time_bins(sessions["escape_at"][escaped]), minlength=TIME_BINS),
+        "showings_escaped": np.bincount(np.minimum(sessions["showings"][escaped], MAX_COUNTED),
+                                        minlength=MAX_COUNTED + 1),
+        "showings_stuck": np.bincount(np.minimum(sessions["showings"][~escaped], MAX_COUNTED),
+                                      minlength=MAX_COUNTED + 1),
+    }
+
+MODELS = {"guess": guessing_totals, "hell": hell_totals}
+
+# -------------------------
+# Process Pool
+# -------------------------
+def simulate(model, params, sessions, workers=None, chunk=1_000_000, seed=0):
+    """
+    Runs `sessions` simulated sessions of a model ("guess" or "hell") in chunks across a
+    process pool and adds up their histograms. Every chunk gets its own child of one
+    SeedSequence, so a seed gives the same totals for any number of workers.
+    """
+    if sessions <= 0 or chunk <= 0:
+        raise ValueError(f"sessions and chunk must be positive, not {sessions} and {chunk}")
+    sizes = [chunk] * (sessions // chunk) + ([sessions % chunk] if sessions % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    task = MODELS[model]
+    if workers == 1:
+        parts = [task(params, size, child) for size, child in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(task, [params] * len(sizes), sizes, seeds))
+    totals = parts[0]
+    for part in parts[1:]:
+        for name, value in part.items():
+            totals[name] = totals[name] + value
+    return totals
+
+# -------------------------
+# Reports
+# -------------------------
+def histogram_percentiles(counts, fractions=(0.5, 0.9, 0.99)):
+    # Seconds at the upper edge of the bin holding each rank (inf once past MAX_MS).
+    total = counts.sum()
+    if not total:
+        return [0.0 for _ in fractions]
+    cumulative = np.cumsum(counts)
+    edges = []
+    for fraction in fractions:
+        index = int(np.searchsorted(cumulative, fraction * total))
+        edges.append(np.inf if index >= TIME_BINS - 1 else (index + 1) * RESOLUTION_MS / 1000)
+    return edges
+
+def print_time_histogram(counts, bin_seconds, total):
+    # The fine bins regrouped to bin_seconds, printed as rows with a bar per share.
+    per_bin = max(1, int(bin_seconds * 1000 // RESOLUTION_MS))
+    grouped = np.add.reduceat(counts[:-1], np.arange(0, TIME_BINS - 1, per_bin))
+    last = np.flatnonzero(grouped)
+    peak = grouped.max() if grouped.size else 0
+    for index in range(last[-1] + 1 if last.size else 0):
+        share = grouped[index] / total
+        start = index * per_bin * RESOLUTION_MS / 1000
+        print(f"    {start:>7.1f}-{start + per_bin * RESOLUTION_MS / 1000:<7.1f} s {share * 100:>7.3f}% "
+              + "#" * int(round(grouped[index] / peak * 50)))
+    if counts[-1]:
+        print(f"    past {MAX_MS // 1000} s {counts[-1] / total * 100:>7.3f}%")
+
+def guessing_report(totals, bin_seconds):
+    n = totals["sessions"]
+    print(f"Guessing: {n} sessions")
+    for code, name in enumerate(GUESS_OUTCOMES):
+        ended = totals["ending_ms"][code]
+        count = int(ended.sum())
+        if not count:
+            continue
+        p50, p90, p99 = histogram_percentiles(ended)
+        guesses = totals["guesses"][code]
+        mean_guesses = (guesses * np.arange(guesses.size)).sum() / count
+        print(f"  {name:<10} {count / n * 100:>8.4f}%  mean guesses {mean_guesses:5.2f}  "
+              f"time to ending p50 {p50:.1f} s, p90 {p90:.1f} s, p99 {p99:.1f} s")
+    hints = totals["hints"]
+    print(f"  hint shown at least once in {hints[1:].sum() / n * 100:.4f}% of sessions, "
+          f"{(hints * np.arange(hints.size)).sum() / n:.5f} per session")
+    if totals["first_hint_ms"].sum():
+        p50, p90, p99 = histogram_percentiles(totals["first_hint_ms"])
+        print(f"  first hint p50 {p50:.1f} s, p90 {p90:.1f} s")
+    print("  time to ending, all outcomes:")
+    print_time_histogram(totals["ending_ms"].sum(axis=0), bin_seconds, n)
+
+def hell_report(totals, bin_seconds):
+    n = totals["sessions"]
+    escape = totals["escape_ms"]
+    escaped = int(escape.sum())
+    print(f"Hell: {n} sessions")
+    print(f"  escaped {escaped / n * 100:.4f}%, on the first showing {totals['showings_escaped'][1] / n * 100:.4f}%")
+    if escaped:
+        p50, p90, p99 = histogram_percentiles(escape)
+        seen = totals["showings_escaped"]
+        print(f"  time to escape p50 {p50:.1f} s, p90 {p90:.1f} s, p99 {p99:.1f} s; "
+              f"mean showings until then {(seen * np.arange(seen.size)).sum() / escaped:.2f}")
+        print("  time to escape:")
+        print_time_histogram(escape, bin_seconds, n)
+
+REPORTS = {"guess": guessing_report, "hell": hell_report}
+
+def to_json(totals):
+    return {name: value.tolist() if isinstance(value, np.ndarray) else value for name, value in totals.items()}
+
+# -------------------------
+# Command Line
+# -------------------------
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text  # e.g. strategy=distinct
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo odds of the guessing game's and hell ending's random rules.")
+    parser.add_argument("models", nargs="*", default=list(MODELS), help=f"any of {', '.join(MODELS)} (default: all)")
+    parser.add_argument("--sessions", type=int, default=10_000_000, help="simulated sessions per model and parameter set")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="sessions per pool task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a parameter, e.g. --set hint_chance=0.001 --set strategy=distinct")
+    parser.add_argument("--params", default=None, metavar="FILE",
+                        help="JSON file: one object of overrides, or a list of them (each may have a \"name\")")
+    parser.add_argument("--bin-seconds", type=float, default=5.0, help="width of the printed time histograms")
+    parser.add_argument("--json", default=None, metavar="PATH", help="also save every histogram here")
+    parser.add_argument("--show-params", action="store_true", help="print the default parameters and exit")
+    args = parser.parse_args()
+
+    defaults = game_params()
+    if args.show_params:
+        print(json.dumps(defaults, indent=2))
+        return
+    if args.sessions <= 0 or args.chunk <= 0:
+        parser.error("--sessions and --chunk must be positive")
+    for model in args.models:
+        if model not in MODELS:
+            parser.error(f"unknown model: {model}")
+    overrides = {}
+    for setting in args.set:
+        name, _, value = setting.partition("=")
+        if name not in defaults:
+            parser.error(f"unknown parameter: {name}")
+        overrides[name] = parse_value(value)
+    sets = [{}]
+    if args.params:
+        with open(args.params, encoding="utf-8") as params_file:
+            loaded = json.load(params_file)
+        sets = loaded if isinstance(loaded, list) else [loaded]
+
+    results = []
+    for number, parameter_set in enumerate(sets, 1):
+        parameter_set = dict(parameter_set)
+        name = parameter_set.pop("name", f"set {number}")
+        unknown = set(parameter_set) - set(defaults)
+        if unknown:
+            parser.error(f"{name}: unknown parameters {', '.join(sorted(unknown))}")
+        params = {**defaults, **parameter_set, **overrides}
+        if len(sets) > 1:
+            print(f"== {name}: {json.dumps({**parameter_set, **overrides})}")
+        for model in args.models:
+            start = time.perf_counter()
+            totals = simulate(model, params, args.sessions, args.workers, args.chunk, args.seed)
+            elapsed = time.perf_counter() - start
+            REPORTS[model](totals, args.bin_seconds)
+            print(f"  ({elapsed:.2f} s, {args.sessions / elapsed / 1e6:.1f} M sessions/s)")
+            results.append({"name": name, "model": model, "params": params, "totals": to_json(totals)})
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file)
+        print(f"Histograms saved to {args.json}")
+
+if __name__ == "__main__":
+    sys.exit(main())
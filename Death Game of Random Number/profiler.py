@@ -0,0 +1,155 @@
+import os
+import json
+import time
+from collections import deque
+
+# -------------------------
+# Per-Frame Profiler
+# -------------------------
+PHASES = ("events", "update", "render", "flip", "sleep")
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list.
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+class NullProfiler:
+    """What the game uses when profiling is off: every call is an empty method."""
+
+    enabled = False
+
+    def frame(self, scene):
+        pass
+
+    def mark(self, phase):
+        pass
+
+class FrameProfiler:
+    """
+    Times each phase of every frame, per scene. A scene loop calls frame(scene) at the
+    top of each frame and mark(phase) after each phase. The phase gets the time since
+    the previous mark, so call sites stay one line each. The last `window` samples of
+    every (scene, phase) are kept for rolling percentiles. Every phase is also recorded
+    as a Chrome trace event (chrome://tracing or Perfetto), keeping the newest max_events.
+    """
+
+    enabled = True
+
+    def __init__(self, window=300, max_events=200000):
+        self.window = window
+        self.origin = time.perf_counter()
+        self.samples = {}  # (scene, phase) -> deque of milliseconds
+        self.events = deque(maxlen=max_events)
+        self.scene = None
+        self.frame_start = None
+        self.last = None
+        self.frames = 0
+
+    def frame(self, scene):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            # The previous frame ends at its last mark, so time spent between scenes
+            # (loading, one-off screens) is not charged to either of them.
+            self.record(self.scene, "frame", self.frame_start, self.last)
+        self.scene = scene
+        self.frame_start = now
+        self.last = now
+        self.frames += 1
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.record(self.scene, phase, self.last, now)
+        self.last = now
+
+    def record(self, scene, phase, start, end):
+        samples = self.samples.get((scene, phase))
+        if samples is None:
+            samples = self.samples[(scene, phase)] = deque(maxlen=self.window)
+        samples.append((end - start) * 1000)
+        self.events.append((scene, phase, start, end))
+
+    def percentiles(self, scene, phase, fractions=(0.5, 0.99)):
+        values = sorted(self.samples.get((scene, phase), ()))
+        return [percentile(values, fraction) for fraction in fractions]
+
+    def summary(self):
+        """Rows of (scene, phase, samples, p50 ms, p99 ms), phases in frame order."""
+        order = {phase: i for i, phase in enumerate(PHASES + ("frame",))}
+        rows = []
+        for scene, phase in sorted(self.samples, key=lambda key: (str(key[0]), order.get(key[1], -1), key[1])):
+            p50, p99 = self.percentiles(scene, phase)
+            rows.append((scene, phase, len(self.samples[(scene, phase)]), p50, p99))
+        return rows
+
+    def print_summary(self):
+        print(f"{'scene':<10} {'phase':<8} {'samples':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        for scene, phase, count, p50, p99 in self.summary():
+            print(f"{scene:<10} {phase:<8} {count:>7} {p50:>8.2f} {p99:>8.2f}")
+
+    def export_trace(self, path):
+        # Complete ("X") events in microseconds; scenes show up as trace categories.
+        trace = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "The Devil's Game"}}]
+        for scene, phase, start, end in self.events:
+            trace.append({
+                "name": f"{scene} frame" if phase == "frame" else phase,
+                "cat": scene,
+                "ph": "X",
+                "ts": round((start - self.origin) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": 1,
+                "tid": 0 if phase == "frame" else 1,
+            })
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, trace_file)
+
+# -------------------------
+# On-Screen Overlay
+# -------------------------
+class ProfileOverlay:
+    """Draws p50/p99 of the current scene's phases in a corner; the text refreshes twice a second."""
+
+    def __init__(self, profiler, font, color=(255, 255, 255), background=(0, 0, 0), refresh=0.5):
+        self.profiler = profiler
+        self.font = font
+        self.color = color
+        self.background = background
+        self.refresh = refresh
+        self.next_refresh = 0.0
+        self.surfaces = []
+
+    def lines(self):
+        profiler = self.profiler
+        lines = [f"{profiler.scene}  p50 / p99 ms"]
+        for phase in PHASES + ("frame",):
+            if (profiler.scene, phase) in profiler.samples:
+                p50, p99 = profiler.percentiles(profiler.scene, phase)
+                lines.append(f"{phase:<7} {p50:6.2f} {p99:6.2f}")
+        return lines
+
+    def draw(self, surface):
+        now = time.perf_counter()
+        if now >= self.next_refresh:
+            self.next_refresh = now + self.refresh
+            self.surfaces = [self.font.render(line, True, self.color) for line in self.lines()]
+        rects = []
+        y = surface.get_height() - sum(text.get_height() for text in self.surfaces) - 4
+        for text in self.surfaces:
+            rect = text.get_rect(topleft=(4, y))
+            surface.fill(self.background, rect)
+            surface.blit(text, rect)
+            rects.append(rect)
+            y += rect.height
+        return rects
+
+def profiler_from_env():
+    """
+    DEVIL_PROFILE=1 turns profiling on; the percentile table prints on exit and the trace
+    is written to DEVIL_PROFILE_TRACE (default devil_trace.json).
+    DEVIL_PROFILE_OVERLAY=1 also shows the overlay.
+    """
+    if os.environ.get("DEVIL_PROFILE", "") in ("", "0"):
+        return NullProfiler()
+    return FrameProfiler()
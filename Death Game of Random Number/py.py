@@ -1,18 +1,37 @@
+import time
+STARTUP_ORIGIN = time.perf_counter()  # Taken before the heavy imports so --measure-startup covers them
+
 import pygame
 import random
 import os
 import math
 from datetime import datetime, timedelta
 import sys
-
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((800, 600), pygame.NOFRAME)  # Remove window decorations
-pygame.display.set_caption("The Devil's Game")
-clock = pygame.time.Clock()
-
-# Configure paths
-SOUNDS_DIR = os.path.join("Death Game of Random Number", "sounds")
+import atexit
+import argparse
+from collections import deque
+from text_cache import TextCache
+from compositor import Compositor
+from renderer import Renderer
+from scene_manager import Scene, SceneManager
+from profiler import NullProfiler, ProfileOverlay, profiler_from_env
+from latency import NullLatency, latency_from_env
+from replay import LiveInput, Recorder, Player, ReplayClock
+from capture import FrameCapture
+from scheduler import EventScheduler
+from state_codec import to_plain, from_plain
+from telemetry import NullTelemetry, telemetry_from_env, OUTCOMES, ENDINGS, DEMON_WON, DEMON_LOST
+from telemetry import GUESS, HARD_TIME, DEMON_END, ENDING, HINT, DRAGON
+from assets import AssetManager, SOUND, MUSIC
+from guess_core import GuessSession, HELL, GAME_OVER, LOWEST, HIGHEST
+from demon_core import DemonCore, DIFFICULTY_ENEMIES, DIFFICULTY_GRACE_TICKS, DIRECTIONS, BLOCK_SIZE, SNAKE_SPEED, LEFT, RIGHT, UP, DOWN, LOST, WON
+from snake_body import SnakeBody
+from enemy_swarm import EnemySwarm
+from sparkle_pool import SparklePool
+
+# Configure paths (relative to this file, so the game starts from any working directory)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUNDS_DIR = os.path.join(BASE_DIR, "sounds")
 BG_MUSIC = os.path.join(SOUNDS_DIR, "background.mp3")
 HORROR_SOUND = os.path.join(SOUNDS_DIR, "horror_scream.mp3")
 LAUGH_SOUND = os.path.join(SOUNDS_DIR, "evil_laugh.mp3")
@@ -21,6 +40,9 @@ HEAVENLY_BGM = os.path.join(SOUNDS_DIR, "so good.mp3")  # Heavenly background mu
 SNAKE_MUSIC = os.path.join(SOUNDS_DIR, "snake.mp3")      # Music for Bloody Demon Mode
 WARNING_MUSIC = os.path.join(SOUNDS_DIR, "warning.mp3")    # Warning screen music
 
+# Hard Time difficulty tier (enemy count): normal, nightmare, inferno or abyss
+DIFFICULTY = os.environ.get("DEVIL_DIFFICULTY", "normal")
+
 # Colors
 BLACK       = (0, 0, 0)
 RED         = (255, 0, 0)
@@ -31,579 +53,902 @@ SKY_BLUE    = (135, 206, 235)
 WHITE       = (255, 255, 255)
 YELLOW      = (255, 255, 0)
 
-# Fonts
-font = pygame.font.SysFont('arial', 40)
-creepy_font = pygame.font.Font(None, 60)
-glitch_font = pygame.font.Font(None, 100)
-
-# Load sounds (except warning, which is loaded in warning_screen)
-try:
-    pygame.mixer.music.load(BG_MUSIC)
-    horror_sound = pygame.mixer.Sound(HORROR_SOUND)
-    laugh_sound = pygame.mixer.Sound(LAUGH_SOUND)
-    sad_sound = pygame.mixer.Sound(SAD_SOUND)
-except Exception as e:
-    print(f"Sound error: {str(e)}")
-    sys.exit()
+# Fonts: (face, size) styles rendered through the shared text cache.
+# A face of None is pygame's default font.
+FONT          = ('arial', 40)
+CREEPY_FONT   = (None, 60)
+GLITCH_FONT   = (None, 100)
+DIALOGUE_FONT = ('arial', 30)
+CONGRATS_SIZES = range(40, 49)  # int(40 * scale) for the pulsing title, scale in [1.0, 1.2]
+
+text_cache = TextCache(maxsize=256)
+
+def render_text(style, text, color, antialias=True):
+    return text_cache.render(style[0], style[1], text, color, antialias)
+
+# Display, clock and asset loader; nothing touches pygame until main() sets these up.
+screen = None
+clock = None
+compositor = None
+renderer = None
+assets = None
+startup = None
+profiler = NullProfiler()  # DEVIL_PROFILE=1 swaps in a FrameProfiler, see init_profiler()
+telemetry = NullTelemetry()  # DEVIL_TELEMETRY=<dir> swaps in a Telemetry writer, see init_telemetry()
+latency = NullLatency()      # Input-to-display tracking, on unless DEVIL_LATENCY=0, see init_latency()
+manager = None
+frame_input = None        # LiveInput, Recorder or Player: each frame's events and game time
+session_started = time.time()
+
+# DEVIL_IDLE=0 polls and redraws every scene at its frame rate, as before idle mode.
+idle_wait = os.environ.get("DEVIL_IDLE", "1") != "0"
+
+def get_ticks():
+    # Game time in ms, taken once per frame by the input source so a replay sees the
+    # same times as the recording (pygame.time.get_ticks() also needs pygame.init()).
+    return frame_input.frame_ms if frame_input is not None else 0
+
+# Sounds load on a worker thread while the warning screen runs; each scene asks for
+# its own assets and the ones of the scenes that can follow it first.
+SCENE_ASSETS = {
+    "warning": ["warning"],
+    "guess": ["background", "laugh"],
+    "demon": ["snake"],
+    "game_over": ["horror", "laugh"],
+    "hell": ["sad"],
+    "escape": ["heavenly"],
+}
+NEXT_SCENES = {
+    "warning": ["guess"],
+    "guess": ["demon", "game_over", "hell", "escape"],
+    "demon": ["game_over", "hell"],
+    "hell": ["escape"],
+}
+
+# -------------------------
+# Start-up (only the subsystems the game uses, in the order it needs them)
+# -------------------------
+def init_display():
+    global screen, clock, compositor, renderer
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600), pygame.NOFRAME)  # Remove window decorations
+    pygame.display.set_caption("The Devil's Game")
+    pygame.event.set_blocked(pygame.MOUSEMOTION)  # No scene reads it, and it would wake idle scenes
+    clock = pygame.time.Clock()
+    compositor = Compositor(screen)
+    # DEVIL_RENDER_MODE=flip pushes every frame in full, to compare against dirty rectangles.
+    renderer = Renderer(screen, os.environ.get("DEVIL_RENDER_MODE", "dirty"))
+    if os.environ.get("DEVIL_RENDER_STATS"):
+        atexit.register(lambda: print(f"Render stats: {renderer.stats()}"))
+
+def init_fonts():
+    pygame.font.init()
+    # Resolve the system font now; after the first run this is a lookup in the disk cache.
+    text_cache.font(*FONT)
+
+def init_audio():
+    # The loader thread opens the mixer itself, so the first frame does not wait for it.
+    # Short stingers are decoded; the looping tracks are streamed as music.
+    global assets
+    budget_mb = float(os.environ.get("DEVIL_AUDIO_BUDGET_MB", "24"))
+    assets = AssetManager(SCENE_ASSETS, NEXT_SCENES, budget=int(budget_mb * 1024 * 1024))
+    assets.register("warning", WARNING_MUSIC, MUSIC)
+    assets.register("background", BG_MUSIC, MUSIC)
+    assets.register("laugh", LAUGH_SOUND, SOUND)
+    assets.register("snake", SNAKE_MUSIC, MUSIC)
+    assets.register("horror", HORROR_SOUND, SOUND)
+    assets.register("sad", SAD_SOUND, MUSIC)
+    assets.register("heavenly", HEAVENLY_BGM, MUSIC)
+    assets.start()
+    if os.environ.get("DEVIL_AUDIO_STATS"):
+        atexit.register(lambda: print("Resident audio memory by scene:\n  " + "\n  ".join(assets.memory_report())))
+
+def init_profiler():
+    global profiler
+    profiler = profiler_from_env()
+    if not profiler.enabled:
+        return
+    if os.environ.get("DEVIL_PROFILE_OVERLAY"):
+        renderer.overlay = ProfileOverlay(profiler, text_cache.font(None, 22)).draw
+    atexit.register(finish_profile)
+
+def init_telemetry():
+    global telemetry
+    telemetry = telemetry_from_env()
+    atexit.register(telemetry.close)  # Runs on every sys.exit() path
+
+def init_latency():
+    global latency
+    latency = latency_from_env()
+    if not latency.enabled:
+        return
+    renderer.after_present.append(latency.shown)
+    if os.environ.get("DEVIL_INPUT_LATENCY"):
+        atexit.register(latency.print_summary)
+
+def init_capture(path):
+    capture = FrameCapture(path, screen, get_ticks)
+    renderer.after_present.append(capture)
+    atexit.register(finish_capture, capture, path)
+
+def finish_capture(capture, path):
+    capture.close()
+    stats = capture.stats()
+    print(f"Captured {stats['frames']} frames to {path} ({stats['bytes'] / (1024 * 1024):.1f} MB), "
+          f"{stats['downscaled']} at half size, {stats['skipped']} skipped")
+
+def finish_profile():
+    trace_path = os.environ.get("DEVIL_PROFILE_TRACE", "devil_trace.json")
+    profiler.print_summary()
+    profiler.export_trace(trace_path)
+    print(f"Frame trace written to {trace_path}")
+
+class StartupTimer:
+    """Wall time of each start-up phase, from process start to the first frame on screen."""
+
+    def __init__(self, origin, exit_after_first_frame=False):
+        self.last = origin
+        self.origin = origin
+        self.phases = []
+        self.exit_after_first_frame = exit_after_first_frame
+        self.done = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def first_frame(self):
+        if self.done:
+            return
+        self.done = True
+        self.mark("first frame")
+        if self.exit_after_first_frame:
+            for phase, seconds in self.phases:
+                print(f"{phase:<20} {seconds * 1000:8.1f} ms")
+            print(f"{'time to first frame':<20} {(self.last - self.origin) * 1000:8.1f} ms")
+            pygame.quit()
+            sys.exit()
 
 # -------------------------
 # Utility: Draw Heaven Background
 # -------------------------
+def build_heaven_background(surface):
+    surface.fill(SKY_BLUE)
+    pygame.draw.ellipse(surface, WHITE, (50, 50, 200, 100))
+    pygame.draw.ellipse(surface, WHITE, (300, 30, 250, 120))
+    pygame.draw.ellipse(surface, WHITE, (600, 80, 150, 80))
+    pygame.draw.ellipse(surface, WHITE, (100, 150, 220, 110))
+
 def draw_heaven_background():
-    screen.fill(SKY_BLUE)
-    pygame.draw.ellipse(screen, WHITE, (50, 50, 200, 100))
-    pygame.draw.ellipse(screen, WHITE, (300, 30, 250, 120))
-    pygame.draw.ellipse(screen, WHITE, (600, 80, 150, 80))
-    pygame.draw.ellipse(screen, WHITE, (100, 150, 220, 110))
+    compositor.draw_backdrop('heaven', build_heaven_background)
 
 # -------------------------
 # Dragon Drawing and Animation
 # -------------------------
+SPRITE_KEY = (255, 0, 255)  # See-through color of baked sprites; no shape uses it
+
+def build_dragon(surface):
+    # Drawn with (x, y) at (40, 40): the tail reaches 40 px left, the head 40 px up.
+    pygame.draw.rect(surface, YELLOW, (40, 40, 120, 60))
+    pygame.draw.rect(surface, YELLOW, (60, 0, 60, 40))
+    pygame.draw.rect(surface, YELLOW, (0, 60, 40, 20))
+    pygame.draw.rect(surface, BLACK, (130, 50, 10, 10))
+    pygame.draw.rect(surface, YELLOW, (80, 30, 10, 10))
+    pygame.draw.rect(surface, YELLOW, (100, 20, 10, 10))
+
 def draw_dragon(x, y):
-    pygame.draw.rect(screen, YELLOW, (x, y, 120, 60))
-    pygame.draw.rect(screen, YELLOW, (x + 20, y - 40, 60, 40))
-    pygame.draw.rect(screen, YELLOW, (x - 40, y + 20, 40, 20))
-    pygame.draw.rect(screen, BLACK, (x + 90, y + 10, 10, 10))
-    pygame.draw.rect(screen, YELLOW, (x + 40, y - 10, 10, 10))
-    pygame.draw.rect(screen, YELLOW, (x + 60, y - 20, 10, 10))
-
-def dragon_animation():
-    start_x = -100
-    end_x = 850
-    y_position = random.randint(50, 200)
-    x = start_x
-    while x < end_x:
+    dragon = compositor.sprite('dragon', (160, 100), build_dragon, colorkey=SPRITE_KEY)
+    renderer.mark(screen.blit(dragon, (x - 40, y - 40)))
+
+class DragonScene(Scene):
+    name = "dragon"
+    fps = 60
+    state = ("x", "y")
+
+    def enter(self):
+        self.x = -100 - 8  # update() moves it first, so the first frame shows it at -100
+        self.end_x = 850
+        self.y = random.randint(50, 200)
+        renderer.invalidate()
+
+    def update(self):
+        self.x += 8
+        if self.x >= self.end_x:
+            self.manager.switch(EscapeScene())
+
+    def render(self):
         screen.fill(BLACK)
-        draw_dragon(x, y_position)
-        pygame.display.flip()
-        clock.tick(60)
-        x += 8
-    escape_sequence()
+        draw_dragon(self.x, self.y)
 
 # -------------------------
 # Lose Dialogue (for Bloody Demon Mode)
 # -------------------------
-def lose_dialogue():
+class LoseScene(Scene):
     """
     Displays a unique, evil, Undertale‑like lose dialogue when you lose in Bloody Demon Mode.
     The music is stopped immediately before showing the dialogue.
     After you press any key, the game-over sequence is triggered.
     """
-    # Stop any playing music immediately.
-    pygame.mixer.music.stop()
-    
-    dialogue_font = pygame.font.SysFont('arial', 30)  # Smaller font for better fit
-    dialogue_lines = [
-        "Oh, you foolish mortal!",
-        "Your feeble attempt has crumbled before the abyss.",
-        "The darkness mocks your weakness...",
-        "You lost the game... and now, you die!"
-    ]
-    screen.fill(BLACK)
-    # Blit each line with vertical spacing.
-    for i, line in enumerate(dialogue_lines):
-        text_surface = dialogue_font.render(line, True, RED)
-        screen.blit(text_surface, (50, 100 + i * 50))
-    prompt = dialogue_font.render("Press any key to embrace your fate...", True, WHITE)
-    screen.blit(prompt, (50, 400))
-    pygame.display.flip()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                waiting = False
-        clock.tick(15)
-    game_over_sequence()
+
+    name = "lose"
+    fps = 15
+
+    def enter(self):
+        # Stop any playing music immediately.
+        assets.stop_music()
+        assets.enter_scene("game_over")
+        
+        dialogue_lines = [
+            "Oh, you foolish mortal!",
+            "Your feeble attempt has crumbled before the abyss.",
+            "The darkness mocks your weakness...",
+            "You lost the game... and now, you die!"
+        ]
+        screen.fill(BLACK)
+        # Blit each line with vertical spacing.
+        for i, line in enumerate(dialogue_lines):
+            text_surface = render_text(DIALOGUE_FONT, line, RED)  # Smaller font for better fit
+            screen.blit(text_surface, (50, 100 + i * 50))
+        prompt = render_text(DIALOGUE_FONT, "Press any key to embrace your fate...", WHITE)
+        screen.blit(prompt, (50, 400))
+        renderer.invalidate()
+
+    def next_change(self):
+        return None  # A still dialogue until a key is pressed
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN:
+            self.manager.switch(GameOverScene())
 
 # -------------------------
 # Bloody Demon Mode (Snake Game)
 # -------------------------
-def bloody_demon_mode():
-    pygame.mixer.music.load(SNAKE_MUSIC)
-    pygame.mixer.music.play(-1)
-    
-    lives = 3
-    block_size = 20
-    snake_speed = 15
-    snake_list = []
-    snake_length = 1
-    score = 0
-    target_score = 1500
-
-    x = 400
-    y = 300
-    x_change = 0
-    y_change = 0
-    food_x = round(random.randrange(0, 800 - block_size) / block_size) * block_size
-    food_y = round(random.randrange(0, 600 - block_size) / block_size) * block_size
-
-    # Increase the number of enemies
-    enemies = []
-    num_enemies = 6  # More dark demon enemies appear now.
-    enemy_size = block_size
-    for i in range(num_enemies):
-        enemy = {
-            'x': random.randrange(0, 800 - enemy_size),
-            'y': random.randrange(0, 600 - enemy_size),
-            'vx': random.choice([-4, -3, 3, 4]),
-            'vy': random.choice([-4, -3, 3, 4])
+DISPLAY_FPS = 60          # Hard Time draws and polls input at this rate; the snake steps at SNAKE_SPEED
+INPUT_QUEUE_SIZE = 3      # Direction changes buffered between steps, one applied per step
+MAX_STEPS_PER_FRAME = 5   # After a stall, drop the backlog instead of replaying every step
+
+def build_enemy(surface):
+    surface.fill(RED)
+    surface.fill(BLACK, (5, 5, 5, 5))
+
+class DemonScene(Scene):
+    """
+    Hard Time on a fixed timestep: frames run at DISPLAY_FPS, and an accumulator steps
+    the core at SNAKE_SPEED whatever the frame rate does. Direction keys queue up and
+    each step takes one, so two quick turns within a step both happen. Everything is
+    drawn where the last step left it, so what is on screen is what the collision tests see.
+    move_latencies holds the seconds from each key to the step that applied it. It is
+    measured from when the key was handled, or from event.posted_at when an injected
+    event carries one (bench.py --latency). DEVIL_INPUT_LATENCY=1 prints it on exit.
+    A turn shows up at the step that applies it, so that is when it goes to the latency
+    tracker; keys that change nothing are not counted.
+    """
+
+    name = "demon"
+    defer_input = True
+    state = ("core", "inputs", "accumulator", "last_time")
+
+    def __init__(self, core=None, fps=DISPLAY_FPS):
+        super().__init__()
+        # The rules live in DemonCore; this scene only feeds it keys and draws its state.
+        # A prepared core can be passed in, e.g. by bench.py to play at a given load.
+        self.core = core
+        self.fps = fps
+        self.step_seconds = 1.0 / SNAKE_SPEED
+        self.inputs = deque()  # (action, time queued)
+        self.move_latencies = deque(maxlen=1000)
+        self.dropped_inputs = 0
+
+    def enter(self):
+        assets.enter_scene("demon")
+        assets.play_music("snake")
+        if self.core is None:
+            self.core = DemonCore(seed=random.getrandbits(32), num_enemies=DIFFICULTY_ENEMIES[DIFFICULTY],
+                                  grace_ticks=DIFFICULTY_GRACE_TICKS[DIFFICULTY])
+        # Opaque, but RLE-encoded through the colorkey they blit several times faster
+        # than plain surfaces (bench.py --draw-cost).
+        self.enemy_sprite = compositor.sprite('enemy', (BLOCK_SIZE, BLOCK_SIZE), build_enemy,
+                                              colorkey=SPRITE_KEY)
+        self.segment_sprite = compositor.sprite('segment', (BLOCK_SIZE, BLOCK_SIZE),
+                                                lambda surface: surface.fill(YELLOW), colorkey=SPRITE_KEY)
+        self.key_actions = {
+            pygame.K_LEFT: LEFT,
+            pygame.K_RIGHT: RIGHT,
+            pygame.K_UP: UP,
+            pygame.K_DOWN: DOWN,
         }
-        enemies.append(enemy)
-
-    game_over_mode = False
-    while not game_over_mode:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    x_change = -block_size
-                    y_change = 0
-                elif event.key == pygame.K_RIGHT:
-                    x_change = block_size
-                    y_change = 0
-                elif event.key == pygame.K_UP:
-                    y_change = -block_size
-                    x_change = 0
-                elif event.key == pygame.K_DOWN:
-                    y_change = block_size
-                    x_change = 0
-
-        x += x_change
-        y += y_change
-
-        # Check collision with boundaries.
-        if x >= 800 or x < 0 or y >= 600 or y < 0:
-            lives -= 1
-            if lives <= 0:
-                game_over_mode = True
-                lose_dialogue()
+        self.accumulator = self.step_seconds  # The first step happens on the first frame
+        self.last_time = get_ticks() / 1000.0
+        renderer.invalidate()
+
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN or event.key not in self.key_actions:
+            return
+        action = self.key_actions[event.key]
+        if self.inputs:
+            if action == self.inputs[-1][0]:
+                return
+        elif DIRECTIONS[action] == (self.core.x_change, self.core.y_change):
+            return  # Already heading that way
+        if len(self.inputs) >= INPUT_QUEUE_SIZE:
+            self.dropped_inputs += 1
+            return
+        self.inputs.append((action, getattr(event, "posted_at", None) or time.perf_counter()))
+
+    def update(self):
+        now = get_ticks() / 1000.0
+        self.accumulator += now - self.last_time
+        self.last_time = now
+        steps = 0
+        while self.accumulator >= self.step_seconds:
+            if steps == MAX_STEPS_PER_FRAME:
+                self.accumulator = 0.0
+                break
+            self.accumulator -= self.step_seconds
+            steps += 1
+            if self.step():
                 return
-            else:
-                x, y = 400, 300
-                x_change, y_change = 0, 0
-                snake_list = []
-                snake_length = 1
-                # Reset enemies.
-                enemies = []
-                for i in range(num_enemies):
-                    enemy = {
-                        'x': random.randrange(0, 800 - enemy_size),
-                        'y': random.randrange(0, 600 - enemy_size),
-                        'vx': random.choice([-4, -3, 3, 4]),
-                        'vy': random.choice([-4, -3, 3, 4])
-                    }
-                    enemies.append(enemy)
 
+    def step(self):
+        # Advance the rules one tick; returns True once the scene has switched away.
+        core = self.core
+        action = None
+        if self.inputs:
+            action, queued_at = self.inputs.popleft()
+            self.move_latencies.append(time.perf_counter() - queued_at)
+            latency.input(self.name, "key", queued_at)
+        status = core.step(action)
+        if status == LOST:
+            telemetry.record(DEMON_END, get_ticks(), DEMON_LOST, core.lives, core.score)
+            self.manager.switch(LoseScene())
+            return True
+        if status == WON:
+            telemetry.record(DEMON_END, get_ticks(), DEMON_WON, core.lives, core.score)
+            self.manager.switch(HellScene())
+            return True
+        return False
+
+    def render(self):
+        core = self.core
+        block_size = BLOCK_SIZE
         screen.fill(BLOOD_RED)
-        pygame.draw.rect(screen, WHITE, [food_x, food_y, block_size, block_size])
-
-        snake_head = [x, y]
-        snake_list.append(snake_head)
-        if len(snake_list) > snake_length:
-            del snake_list[0]
-
-        # Check self-collision.
-        for segment in snake_list[:-1]:
-            if segment == snake_head:
-                lives -= 1
-                if lives <= 0:
-                    game_over_mode = True
-                    lose_dialogue()
-                    return
-                else:
-                    x, y = 400, 300
-                    x_change, y_change = 0, 0
-                    snake_list = []
-                    snake_length = 1
-
-        for segment in snake_list:
-            pygame.draw.rect(screen, YELLOW, [segment[0], segment[1], block_size, block_size])
-
-        # Update and draw dark demon enemies.
-        for enemy in enemies:
-            enemy['x'] += enemy['vx']
-            enemy['y'] += enemy['vy']
-            if enemy['x'] <= 0 or enemy['x'] >= 800 - enemy_size:
-                enemy['vx'] = -enemy['vx']
-            if enemy['y'] <= 0 or enemy['y'] >= 600 - enemy_size:
-                enemy['vy'] = -enemy['vy']
-            pygame.draw.rect(screen, RED, [enemy['x'], enemy['y'], enemy_size, enemy_size])
-            pygame.draw.rect(screen, BLACK, [enemy['x'] + 5, enemy['y'] + 5, 5, 5])
-            # Check collision with snake head.
-            if (x < enemy['x'] + enemy_size and
-                x + block_size > enemy['x'] and
-                y < enemy['y'] + enemy_size and
-                y + block_size > enemy['y']):
-                lives -= 1
-                if lives <= 0:
-                    game_over_mode = True
-                    lose_dialogue()
-                    return
-                else:
-                    x, y = 400, 300
-                    x_change, y_change = 0, 0
-                    snake_list = []
-                    snake_length = 1
-
-        # Check if snake eats the food.
-        if x == food_x and y == food_y:
-            food_x = round(random.randrange(0, 800 - block_size) / block_size) * block_size
-            food_y = round(random.randrange(0, 600 - block_size) / block_size) * block_size
-            snake_length += 1
-            score += 100
-
-        score_text = font.render("Score: " + str(score), True, WHITE)
-        lives_text = font.render("Lives: " + str(lives), True, WHITE)
-        screen.blit(score_text, (10, 10))
-        screen.blit(lives_text, (10, 50))
-
-        pygame.display.update()
-
-        if score >= target_score:
-            hell_ending()
-            return
+        renderer.mark(pygame.draw.rect(screen, WHITE, [core.food_x, core.food_y, block_size, block_size]))
+
+        # The snake blinks while enemies cannot hurt it yet (tiers with a spawn grace period).
+        if core.grace % 4 < 2:
+            segment = self.segment_sprite
+            renderer.mark_many(screen.blits([(segment, position) for position in core.snake_list]))
+
+        # Draw dark demon enemies in one batch.
+        renderer.mark_many(screen.blits([(self.enemy_sprite, position) for position in core.enemy_positions()]))
+
+        score_text = render_text(FONT, "Score: " + str(core.score), WHITE)
+        lives_text = render_text(FONT, "Lives: " + str(core.lives), WHITE)
+        renderer.mark(screen.blit(score_text, (10, 10)))
+        renderer.mark(screen.blit(lives_text, (10, 50)))
 
-        clock.tick(snake_speed)
+    def exit(self):
+        if os.environ.get("DEVIL_INPUT_LATENCY") and self.move_latencies:
+            latencies = sorted(self.move_latencies)
+            print(f"Key to move: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms, "
+                  f"{len(latencies)} moves, {self.dropped_inputs} keys dropped")
 
 # -------------------------
-# Warning Screen Function (with warning.mp3)
+# Warning Screen (with warning.mp3)
 # -------------------------
-def warning_screen():
-    warning_music = pygame.mixer.Sound(os.path.join(SOUNDS_DIR, "warning.mp3"))
-    warning_music.play(-1)
+def build_warning_backdrop(surface, no_clicked):
+    surface.fill(BLACK)
+    if not no_clicked:
+        warn_title = render_text(CREEPY_FONT, "WARNING!", RED)
+        warn_line1 = render_text(FONT, "This game is not for the faint of heart.", RED)
+        warn_line2 = render_text(FONT, "Do you dare to proceed?", RED)
+    else:
+        warn_title = render_text(CREEPY_FONT, "YOUR SOUL IS DAMNED!", RED)
+        warn_line1 = render_text(FONT, "You have rejected fate...", RED)
+        warn_line2 = render_text(FONT, "Now, eternal torment awaits you!", RED)
     
-    yes_button_scale = 1.0
-    no_clicked = False
+    surface.blit(warn_title, warn_title.get_rect(center=(400, 100)))
+    surface.blit(warn_line1, warn_line1.get_rect(center=(400, 200)))
+    surface.blit(warn_line2, warn_line2.get_rect(center=(400, 260)))
+
+class WarningScene(Scene):
+    name = "warning"
+    state = ("yes_button_scale", "no_clicked", "yes_rect")
 
     base_yes_size = (150, 80)
     base_no_size  = (150, 80)
     yes_button_center = (300, 450)
     no_button_center  = (500, 450)
-    
-    running_warning = True
-    while running_warning:
-        screen.fill(BLACK)
-        
-        if not no_clicked:
-            warn_title = creepy_font.render("WARNING!", True, RED)
-            warn_line1 = font.render("This game is not for the faint of heart.", True, RED)
-            warn_line2 = font.render("Do you dare to proceed?", True, RED)
-        else:
-            warn_title = creepy_font.render("YOUR SOUL IS DAMNED!", True, RED)
-            warn_line1 = font.render("You have rejected fate...", True, RED)
-            warn_line2 = font.render("Now, eternal torment awaits you!", True, RED)
-        
-        screen.blit(warn_title, warn_title.get_rect(center=(400, 100)))
-        screen.blit(warn_line1, warn_line1.get_rect(center=(400, 200)))
-        screen.blit(warn_line2, warn_line2.get_rect(center=(400, 260)))
-        
-        yes_width  = int(base_yes_size[0] * yes_button_scale)
-        yes_height = int(base_yes_size[1] * yes_button_scale)
-        yes_rect = pygame.Rect(0, 0, yes_width, yes_height)
-        yes_rect.center = yes_button_center
-        pygame.draw.rect(screen, RED, yes_rect)
-        yes_text = font.render("YES", True, BLACK)
-        screen.blit(yes_text, yes_text.get_rect(center=yes_rect.center))
-        
-        no_rect = pygame.Rect(0, 0, base_no_size[0], base_no_size[1])
-        no_rect.center = no_button_center
-        pygame.draw.rect(screen, RED, no_rect)
-        no_text = font.render("NO", True, BLACK)
-        screen.blit(no_text, no_text.get_rect(center=no_rect.center))
-        
-        pygame.display.flip()
+
+    def enter(self):
+        telemetry.start_play(get_ticks())
+        assets.enter_scene("warning")
+        assets.play_music("warning")  # Also ends the heavenly music of a last session in kiosk mode
+        self.yes_button_scale = 1.0
+        self.no_clicked = False
+        self.no_rect = pygame.Rect(0, 0, self.base_no_size[0], self.base_no_size[1])
+        self.no_rect.center = self.no_button_center
+        self.layout_yes_button()
+        renderer.invalidate()
+
+    def layout_yes_button(self):
+        yes_width  = int(self.base_yes_size[0] * self.yes_button_scale)
+        yes_height = int(self.base_yes_size[1] * self.yes_button_scale)
+        self.yes_rect = pygame.Rect(0, 0, yes_width, yes_height)
+        self.yes_rect.center = self.yes_button_center
+
+    def handle(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_pos = event.pos
+            if self.yes_rect.collidepoint(mouse_pos):
+                self.manager.switch(GuessScene())
+            elif self.no_rect.collidepoint(mouse_pos):
+                self.no_clicked = True
+                self.yes_button_scale = 2.0
+                self.layout_yes_button()
+                renderer.invalidate()  # New backdrop text and a bigger YES button
+
+    def next_change(self):
+        return None
+
+    def render(self):
+        no_clicked = self.no_clicked
+        compositor.draw_backdrop(('warning', no_clicked),
+                                 lambda surface: build_warning_backdrop(surface, no_clicked))
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = event.pos
-                if yes_rect.collidepoint(mouse_pos):
-                    warning_music.stop()
-                    running_warning = False
-                elif no_rect.collidepoint(mouse_pos):
-                    no_clicked = True
-                    yes_button_scale = 2.0
+        pygame.draw.rect(screen, RED, self.yes_rect)
+        yes_text = render_text(FONT, "YES", BLACK)
+        screen.blit(yes_text, yes_text.get_rect(center=self.yes_rect.center))
         
-        clock.tick(30)
+        pygame.draw.rect(screen, RED, self.no_rect)
+        no_text = render_text(FONT, "NO", BLACK)
+        screen.blit(no_text, no_text.get_rect(center=self.no_rect.center))
+
+    def exit(self):
+        assets.stop_music()
 
 # -------------------------
 # Other Game Functions
 # -------------------------
 def calculate_death_date():
-    death_date = datetime.now() + timedelta(days=random.randint(1, 666))
-    return death_date.strftime("%d %B %Y, %H:%M:%S")
+    now = datetime.fromtimestamp(session_started) + timedelta(milliseconds=get_ticks())
+    return session.death_date(now)
 
 def show_hint():
     global hint_active, hint_start_time, last_hint_time
-    current_time = pygame.time.get_ticks()
+    current_time = get_ticks()
     if current_time - last_hint_time > hint_cooldown:
         hint_active = True
         hint_start_time = current_time
         last_hint_time = current_time
 
 def draw_glitch_hint():
-    text = glitch_font.render(str(target_number), True, RED)
+    text = render_text(GLITCH_FONT, str(session.target), RED)
     x = random.randint(100, 500)
     y = random.randint(100, 400)
     for _ in range(3):
         offset_x = random.randint(-5, 5)
         offset_y = random.randint(-5, 5)
-        screen.blit(text, (x + offset_x, y + offset_y))
+        renderer.mark(screen.blit(text, (x + offset_x, y + offset_y)))
 
 def draw_blood_effect():
-    blood = pygame.Surface((800, 600))
-    blood.set_alpha(150)
-    blood.fill(BLOOD_RED)
-    screen.blit(blood, (0, 0))
+    screen.blit(compositor.overlay(BLOOD_RED, 150), (0, 0))
 
 def draw_hell_scene():
-    hell = pygame.Surface((800, 600))
-    hell.set_alpha(200)
-    hell.fill(HELL_ORANGE)
-    screen.blit(hell, (0, 0))
-
-def game_over_sequence():
-    pygame.mixer.music.stop()
-    screen.fill(BLACK)
-    draw_blood_effect()
-    
-    death_date = calculate_death_date()
-    line1 = creepy_font.render("YOUR DEATH DATE:", True, RED)
-    line2 = creepy_font.render(death_date, True, RED)
-    
-    screen.blit(line1, (50, 250))
-    screen.blit(line2, (50, 300))
-    
-    pygame.display.flip()
-    horror_sound.play()
-    laugh_sound.play()
-    pygame.time.wait(5000)
-    pygame.quit()
-    sys.exit()
+    screen.blit(compositor.overlay(HELL_ORANGE, 200), (0, 0))
+
+def end_session(manager):
+    # A kiosk hands the screen to the next player instead of exiting; decoded sounds,
+    # cached text and baked backdrops all stay loaded.
+    if kiosk:
+        reset_game()
+        manager.switch(WarningScene())
+    else:
+        manager.quit()
+
+class GameOverScene(Scene):
+    name = "game_over"
+    fps = 15
+    duration = 5000
+    state = ("start_time",)
+
+    def enter(self):
+        telemetry.record(ENDING, get_ticks(), ENDINGS["game_over"], session.attempts)
+        assets.stop_music()
+        screen.fill(BLACK)
+        draw_blood_effect()
+        
+        death_date = calculate_death_date()
+        line1 = render_text(CREEPY_FONT, "YOUR DEATH DATE:", RED)
+        line2 = render_text(CREEPY_FONT, death_date, RED)
+        
+        screen.blit(line1, (50, 250))
+        screen.blit(line2, (50, 300))
+        
+        renderer.invalidate()
+        assets.play("horror", "stinger")
+        assets.play("laugh", "stinger")
+        self.start_time = get_ticks()
+
+    def next_change(self):
+        return self.start_time + self.duration
+
+    def update(self):
+        if get_ticks() - self.start_time >= self.duration:
+            end_session(self.manager)
 
 # -------------------------
 # Heaven Ending (Escape Sequence)
 # -------------------------
-def escape_sequence():
-    pygame.mixer.music.stop()
-    try:
-        pygame.mixer.music.load(HEAVENLY_BGM)
-    except Exception as e:
-        print(f"Error loading heavenly bgm: {str(e)}")
-    pygame.mixer.music.play(-1)
-    
-    start_time = pygame.time.get_ticks()
-    duration = 120000  # 2 minutes
+SPARKLE_CAP = 1000          # Sparkles alive at once; clicks beyond it spawn nothing
+SPARKLE_SPAWN_RATE = 20     # Click sparkles per second, on average...
+SPARKLE_SPAWN_BURST = 10    # ...and at most this many in a quick burst of clicks
 
-    sparkles = []
-    for i in range(10):
-        x = random.randint(0, 800)
-        y = random.randint(600, 1200)
-        radius = random.randint(20, 50)
-        speed = random.uniform(0.2, 1.0)
-        sparkles.append([x, y, radius, speed])
-    
+def sparkle_sprite(radius):
+    return compositor.sprite(('sparkle', radius), (2 * radius, 2 * radius),
+                             lambda surface: pygame.draw.circle(surface, WHITE, (radius, radius), radius),
+                             colorkey=SPRITE_KEY)
+
+class EscapeScene(Scene):
+    name = "escape"
+    duration = 120000  # 2 minutes
+    state = ("start_time", "sparkles")
     exit_button_rect = pygame.Rect(750, 10, 40, 40)
-    
-    while pygame.time.get_ticks() - start_time < duration:
-        draw_heaven_background()
+
+    def enter(self):
+        telemetry.record(ENDING, get_ticks(), ENDINGS["escape"], session.attempts)
+        assets.enter_scene("escape")
+        assets.play_music("heavenly")
         
-        for s in sparkles:
-            s[1] -= s[3]
-            pygame.draw.circle(screen, WHITE, (int(s[0]), int(s[1])), s[2])
-            if s[1] + s[2] < 0:
-                s[1] = 600 + s[2]
+        self.start_time = get_ticks()
+        self.sparkles = SparklePool(SPARKLE_CAP, 600, SPARKLE_SPAWN_RATE, SPARKLE_SPAWN_BURST)
+        for i in range(10):
+            x = random.randint(0, 800)
+            y = random.randint(600, 1200)
+            radius = random.randint(20, 50)
+            speed = random.uniform(0.2, 1.0)
+            self.sparkles.spawn(x, y, radius, speed, loops=True)
         
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if exit_button_rect.collidepoint(event.pos):
-                    pygame.quit()
-                    sys.exit()
-                else:
-                    mx, my = event.pos
-                    radius = random.randint(10, 30)
-                    speed = random.uniform(0.5, 2.0)
-                    sparkles.append([mx, my, radius, speed])
+        # Everything the scene shows is text that never changes, so render it all up front.
+        self.congrats_frames = text_cache.prebake('arial', CONGRATS_SIZES, "CONGRATS, YOU ESCAPED HELL!", BLACK)
+        self.credits_text = render_text(DIALOGUE_FONT, "Credits: by OmakoZ", BLACK)
+        self.x_text = render_text(DIALOGUE_FONT, "X", WHITE)
+        renderer.invalidate()
+
+    def handle(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.exit_button_rect.collidepoint(event.pos):
+                end_session(self.manager)
+            elif not self.sparkles.full() and self.sparkles.allow(get_ticks()):
+                mx, my = event.pos
+                radius = random.randint(10, 30)
+                speed = random.uniform(0.5, 2.0)
+                self.sparkles.spawn(mx, my, radius, speed)
+
+    def update(self):
+        if get_ticks() - self.start_time >= self.duration:
+            end_session(self.manager)
+            return
+        self.sparkles.update()
+
+    def render(self):
+        draw_heaven_background()
         
-        time_elapsed = (pygame.time.get_ticks() - start_time) / 1000.0
-        scale = 1 + 0.1 * (1 + math.sin(time_elapsed * 2 * math.pi))
-        dynamic_font = pygame.font.SysFont('arial', int(40 * scale))
-        congrats_text = dynamic_font.render("CONGRATS, YOU ESCAPED HELL!", True, BLACK)
-        screen.blit(congrats_text, congrats_text.get_rect(center=(400, 300)))
+        renderer.mark_many(screen.blits(self.sparkles.blit_sequence(sparkle_sprite)))
         
-        credits_font = pygame.font.SysFont('arial', 30)
-        credits_text = credits_font.render("Credits: by OmakoZ", True, BLACK)
-        screen.blit(credits_text, credits_text.get_rect(center=(400, 550)))
+        time_elapsed = (get_ticks() - self.start_time) / 1000.0
+        scale = 1 + 0.1 * (1 + math.sin(time_elapsed * 2 * math.pi))
+        congrats_text = self.congrats_frames[int(40 * scale)]
+        renderer.mark(screen.blit(congrats_text, congrats_text.get_rect(center=(400, 300))))
         
-        pygame.draw.rect(screen, RED, exit_button_rect)
-        x_font = pygame.font.SysFont('arial', 30)
-        x_text = x_font.render("X", True, WHITE)
-        screen.blit(x_text, x_text.get_rect(center=exit_button_rect.center))
+        screen.blit(self.credits_text, self.credits_text.get_rect(center=(400, 550)))
         
-        pygame.display.flip()
-        clock.tick(30)
-    pygame.quit()
-    sys.exit()
+        pygame.draw.rect(screen, RED, self.exit_button_rect)
+        screen.blit(self.x_text, self.x_text.get_rect(center=self.exit_button_rect.center))
 
 # -------------------------
-# Hell Ending Function
+# Hell Ending
 # -------------------------
-def hell_ending():
-    pygame.mixer.music.stop()
-    screen.fill(BLACK)
-    draw_hell_scene()
-    
-    text1 = creepy_font.render("THERE IS NO ESCAPE", True, RED)
-    text2 = creepy_font.render("YOU BELONG TO HELL", True, RED)
-    screen.blit(text1, (200, 250))
-    screen.blit(text2, (200, 300))
-    
-    sad_sound.play(-1)
-    pygame.display.flip()
-    
-    start_time = pygame.time.get_ticks()
-    escape_button_active = False
+ESCAPE_BUTTON_CHANCE = 0.005  # Per frame (at NOMINAL_FPS) while the ESCAPE button is hidden
+ESCAPE_BUTTON_TIME = 2000     # How long it stays up
+
+def build_hell_backdrop(surface):
+    # Black blended with the hell overlay never changes, so it is baked with the text.
+    surface.fill(BLACK)
+    surface.blit(compositor.overlay(HELL_ORANGE, 200), (0, 0))
+    surface.blit(render_text(CREEPY_FONT, "THERE IS NO ESCAPE", RED), (200, 250))
+    surface.blit(render_text(CREEPY_FONT, "YOU BELONG TO HELL", RED), (200, 300))
+
+class HellScene(Scene):
+    name = "hell"
+    duration = 600000
+    state = ("start_time", "escape_button_active", "escape_button_start_time", "timers")
     escape_button_rect = pygame.Rect(600, 500, 150, 80)
-    escape_button_start_time = 0
-    
-    while pygame.time.get_ticks() - start_time < 600000:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if escape_button_active and escape_button_rect.collidepoint(event.pos):
-                    sad_sound.stop()
-                    escape_sequence()
-                    return
-        
-        current_time = pygame.time.get_ticks()
-        if not escape_button_active and random.random() < 0.005:
-            escape_button_active = True
-            escape_button_start_time = current_time
-        
-        if escape_button_active and current_time - escape_button_start_time > 2000:
-            escape_button_active = False
-        
-        screen.fill(BLACK)
-        draw_hell_scene()
-        screen.blit(text1, (200, 250))
-        screen.blit(text2, (200, 300))
+
+    def enter(self):
+        telemetry.record(ENDING, get_ticks(), ENDINGS["hell"], session.attempts)
+        assets.enter_scene("hell")
+        assets.play_music("sad")
+        self.start_time = get_ticks()
+        self.escape_button_active = False
+        self.escape_button_start_time = 0
+        self.timers = EventScheduler()
+        self.timers.after_chance("escape_show", self.start_time, ESCAPE_BUTTON_CHANCE, NOMINAL_FPS)
+        renderer.invalidate()
+
+    def handle(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.escape_button_active and self.escape_button_rect.collidepoint(event.pos):
+                self.manager.switch(EscapeScene())
+
+    def next_change(self):
+        return min(self.timers.next_deadline(), self.start_time + self.duration)
+
+    def update(self):
+        current_time = get_ticks()
+        if current_time - self.start_time >= self.duration:
+            end_session(self.manager)
+            return
         
-        if escape_button_active:
-            pygame.draw.rect(screen, GREEN, escape_button_rect)
-            escape_text = font.render("ESCAPE!", True, BLACK)
-            screen.blit(escape_text, escape_text.get_rect(center=escape_button_rect.center))
+        for name in self.timers.due(current_time):
+            if name == "escape_show":
+                self.escape_button_active = True
+                self.escape_button_start_time = current_time
+                self.timers.at("escape_hide", current_time + ESCAPE_BUTTON_TIME + 1)
+                self.dirty = True
+            elif name == "escape_hide":
+                self.escape_button_active = False
+                self.dirty = True
+                self.timers.after_chance("escape_show", current_time, ESCAPE_BUTTON_CHANCE, NOMINAL_FPS)
+
+    def render(self):
+        compositor.draw_backdrop('hell', build_hell_backdrop)
         
-        pygame.display.flip()
-        clock.tick(30)
-    
-    pygame.quit()
-    sys.exit()
+        if self.escape_button_active:
+            renderer.mark(pygame.draw.rect(screen, GREEN, self.escape_button_rect))
+            escape_text = render_text(FONT, "ESCAPE!", BLACK)
+            screen.blit(escape_text, escape_text.get_rect(center=self.escape_button_rect.center))
+
+    def exit(self):
+        assets.stop_music()
 
 # -------------------------
 # Game Variables
 # -------------------------
-target_number = random.randint(1, 666)
-attempts = 0
-max_attempts = 10
-user_input = ""
-game_over = False
-hint_active = False
-hint_start_time = 0
 HINT_DURATION = 1000  # 1 second
 hint_cooldown = 10000
-last_hint_time = 0
-dragon_triggered = False
+# Random triggers, as a chance per frame at the game's nominal 30 fps. EventScheduler turns
+# each into a waiting time drawn once, so the real frame rate no longer changes how often.
+NOMINAL_FPS = 30
+HINT_CHANCE = 0.0001
+DRAGON_CHANCE = 0.0001
+kiosk = False  # --kiosk: start over at the warning screen instead of exiting
+
+GAME_VARIABLES = ("session", "user_input",
+                  "hint_active", "hint_start_time", "last_hint_time", "dragon_triggered")
+
+def reset_game():
+    # The rules live in a GuessSession; its seed comes from the game's RNG, so a seeded
+    # or replayed run gets the same number and death date.
+    global session, user_input
+    global hint_active, hint_start_time, last_hint_time, dragon_triggered
+    session = GuessSession(seed=random.getrandbits(32))
+    user_input = ""
+    hint_active = False
+    hint_start_time = 0
+    last_hint_time = 0
+    dragon_triggered = False
 
 # -------------------------
-# Main Game Loop
+# Guessing Game (main scene)
 # -------------------------
-warning_screen()
-pygame.mixer.music.play(-1)
-
-running = True
-while running:
-    current_time = pygame.time.get_ticks()
-    
-    if random.random() < 0.0001 and not hint_active:
-        show_hint()
-    
-    if hint_active and current_time - hint_start_time > HINT_DURATION:
-        hint_active = False
-
-    if not dragon_triggered and random.random() < 0.0001:
-        dragon_triggered = True
-        dragon_animation()
-        running = False
-        break
-
-    screen.fill(BLACK)
-    
-    instr_text = font.render(f"Guess the number (1-666). Attempts left: {max_attempts - attempts}", True, RED)
-    screen.blit(instr_text, (50, 50))
-    
-    input_text = font.render(f"Your guess: {user_input}", True, RED)
-    screen.blit(input_text, (50, 150))
-    
-    history_text = font.render(f"Failed attempts: {attempts}/10", True, RED)
-    screen.blit(history_text, (50, 500))
-    
-    if hint_active:
-        draw_glitch_hint()
-    
-    hard_time_rect = pygame.Rect(650, 500, 140, 60)
-    pygame.draw.rect(screen, RED, hard_time_rect)
-    hard_time_text = font.render("Hard Time", True, BLACK)
-    screen.blit(hard_time_text, hard_time_text.get_rect(center=hard_time_rect.center))
-    
-    pygame.display.flip()
-    
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
+hard_time_rect = pygame.Rect(650, 500, 140, 60)
+
+def build_guess_backdrop(surface):
+    surface.fill(BLACK)
+    pygame.draw.rect(surface, RED, hard_time_rect)
+    hard_time_text = render_text(FONT, "Hard Time", BLACK)
+    surface.blit(hard_time_text, hard_time_text.get_rect(center=hard_time_rect.center))
+
+class GuessScene(Scene):
+    name = "guess"
+    state = ("timers",)
+
+    def enter(self):
+        assets.enter_scene("guess")
+        assets.play_music("background")
+        now = get_ticks()
+        self.timers = EventScheduler()
+        self.timers.after_chance("hint", now, HINT_CHANCE, NOMINAL_FPS)
+        if not dragon_triggered:
+            self.timers.after_chance("dragon", now, DRAGON_CHANCE, NOMINAL_FPS)
+        renderer.invalidate()
+
+    def handle(self, event):
+        global user_input
+        if event.type == pygame.MOUSEBUTTONDOWN:
             if hard_time_rect.collidepoint(event.pos):
-                bloody_demon_mode()
-                running = False
-                break
+                telemetry.record(HARD_TIME, get_ticks())
+                self.manager.switch(DemonScene())
         elif event.type == pygame.KEYDOWN:
-            if game_over:
-                continue
+            if session.outcome == GAME_OVER:
+                return
             if event.key == pygame.K_RETURN:
                 try:
-                    guess = int(user_input)
-                    if guess == target_number:
-                        hell_ending()
-                        running = False
-                    else:
-                        laugh_sound.play()
-                        attempts += 1
-                        if attempts >= max_attempts:
-                            game_over = True
-                            game_over_sequence()
-                            running = False
-                        else:
-                            user_input = ""
-                except:
+                    number = int(user_input)
+                except ValueError:
+                    user_input = ""
+                    return
+                outcome = session.guess(number)
+                telemetry.record(GUESS, get_ticks(), OUTCOMES[outcome], session.attempts, number)
+                if outcome == HELL:
+                    self.manager.switch(HellScene())
+                    return
+                assets.play("laugh", "ui")
+                if outcome == GAME_OVER:
+                    self.manager.switch(GameOverScene())
+                else:
                     user_input = ""
             elif event.key == pygame.K_BACKSPACE:
                 user_input = user_input[:-1]
             else:
                 user_input += event.unicode
 
-    clock.tick(30)
+    def next_change(self):
+        # The glitch hint jumps around every frame; otherwise the screen waits on the player.
+        return 0 if hint_active else self.timers.next_deadline()
+
+    def update(self):
+        global hint_active, dragon_triggered
+        current_time = get_ticks()
+        for name in self.timers.due(current_time):
+            if name == "hint":
+                if not hint_active:
+                    show_hint()  # Still held back by hint_cooldown
+                    if hint_active:
+                        self.timers.at("hint_end", hint_start_time + HINT_DURATION + 1)
+                        self.dirty = True
+                        telemetry.record(HINT, current_time)
+                # No hint was rolled while one showed, so the next wait starts when it ends.
+                start = hint_start_time + HINT_DURATION + 1 if hint_active else current_time
+                self.timers.after_chance("hint", start, HINT_CHANCE, NOMINAL_FPS)
+            elif name == "hint_end":
+                hint_active = False
+                self.dirty = True
+            elif name == "dragon":
+                dragon_triggered = True
+                telemetry.record(DRAGON, current_time)
+                self.manager.switch(DragonScene())
+                return
+
+    def render(self):
+        compositor.draw_backdrop('guess', build_guess_backdrop)
+        
+        instr_text = render_text(FONT, f"Guess the number ({LOWEST}-{HIGHEST}). Attempts left: {session.attempts_left()}", RED)
+        renderer.mark(screen.blit(instr_text, (50, 50)))
+        
+        input_text = render_text(FONT, f"Your guess: {user_input}", RED)
+        renderer.mark(screen.blit(input_text, (50, 150)))
+        
+        history_text = render_text(FONT, f"Failed attempts: {session.attempts}/{session.max_attempts}", RED)
+        renderer.mark(screen.blit(history_text, (50, 500)))
+        
+        if hint_active:
+            draw_glitch_hint()
+
+# -------------------------
+# Replay Snapshots
+# -------------------------
+SCENES = {scene.__name__: scene for scene in (WarningScene, GuessScene, DemonScene, LoseScene, GameOverScene,
+                                              DragonScene, EscapeScene, HellScene)}
+# The only classes a snapshot may rebuild (see state_codec).
+STATE_TYPES = (GuessSession, EventScheduler, DemonCore, SnakeBody, EnemySwarm, SparklePool)
+
+def capture_state():
+    # Everything needed to resume mid-session: the RNG, the game variables and the scene,
+    # as plain JSON data.
+    game = globals()
+    return to_plain({
+        "random": random.getstate(),
+        "game": {name: game[name] for name in GAME_VARIABLES},
+        "scene": type(manager.scene).__name__,
+        "scene_state": manager.scene.snapshot(),
+    }, STATE_TYPES)
+
+def restore_state(plain):
+    # The scene to start from, and what to put back once its enter() has run.
+    state = from_plain(plain, STATE_TYPES)
+    if state["scene"] not in SCENES:
+        raise ValueError(f"Snapshot is in an unknown scene: {state['scene']!r}")
+    def restore(scene):
+        scene.restore(state["scene_state"])
+        globals().update(state["game"])
+        random.setstate(state["random"])
+        renderer.invalidate()
+    return SCENES[state["scene"]](), restore
+
+# -------------------------
+# Entry Point
+# -------------------------
+def play(first_scene, restore=None):
+    # One frame loop for every scene; returns when a scene quits the game.
+    global manager, frame_input
+    if frame_input is None:
+        frame_input = LiveInput()
+    manager = SceneManager(renderer, clock, profiler, frame_input, on_present=startup.first_frame,
+                           idle=idle_wait, latency=latency)
+    manager.run(first_scene, restore)
+
+def main(argv=None):
+    global startup, kiosk, clock, frame_input, session_started
+    parser = argparse.ArgumentParser(description="The Devil's Game")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="print the time each start-up phase takes up to the first frame, then exit")
+    parser.add_argument("--kiosk", action="store_true",
+                        help="start a new session after every ending instead of exiting")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the game's random numbers")
+    parser.add_argument("--record", metavar="PATH", help="record the seed and every input of this session")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded session")
+    parser.add_argument("--fast", action="store_true", help="with --replay: no window and no waiting")
+    parser.add_argument("--seek", type=int, default=0, metavar="FRAME",
+                        help="with --replay: skip ahead to this frame from the nearest snapshot")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="save every frame shown (turn it into images with capture.py)")
+    args = parser.parse_args(argv)
+    kiosk = args.kiosk
+    if DIFFICULTY not in DIFFICULTY_ENEMIES:
+        sys.exit(f"Unknown DEVIL_DIFFICULTY '{DIFFICULTY}': use one of {', '.join(DIFFICULTY_ENEMIES)}")
+
+    player = None
+    if args.replay:
+        player = Player(args.replay, realtime=not args.fast)
+        seed, session_started = player.seed, player.started
+        if args.fast:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+    else:
+        seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(63)
+        session_started = time.time()
+
+    startup = StartupTimer(STARTUP_ORIGIN, exit_after_first_frame=args.measure_startup)
+    startup.mark("imports")
+    init_display()
+    startup.mark("display init")
+    init_fonts()
+    startup.mark("font init")
+    init_audio()
+    startup.mark("audio loader start")
+    init_profiler()
+    if player is None:
+        init_telemetry()  # A replay would only record the same plays again
+        init_latency()    # ...and its timings would only be the replay's pacing
+    if args.capture:
+        init_capture(args.capture)
+
+    random.seed(seed)
+    reset_game()
+    first_scene, restore = WarningScene(), None
+    if player is not None:
+        frame_input = player
+        clock = ReplayClock()
+        player.watch(random.getstate)
+        state = player.seek(args.seek)
+        if state is not None:
+            first_scene, restore = restore_state(state)
+    elif args.record:
+        frame_input = Recorder(args.record, seed, session_started, capture_state, random.getstate)
+    play(first_scene, restore)
+    frame_input.close()
+
+    if player is not None:
+        print(f"Replayed {player.frame} frames")
+        if player.diverged_at is not None:
+            print(f"Replay diverged from the recording at frame {player.diverged_at}")
+
+    pygame.quit()
+    sys.exit()
 
-pygame.quit()
-sys.exit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import pygame
+
+# -------------------------
+# Frame Presenter (full flips or dirty rectangles)
+# -------------------------
+FLIP_MODE  = "flip"
+DIRTY_MODE = "dirty"
+
+class Renderer:
+    """
+    Pushes finished frames to the display.
+    In dirty mode scenes mark() the rectangles they drew this frame and present() only
+    updates those plus last frame's (so whatever moved away gets erased). invalidate()
+    forces the next present() to be a full flip, e.g. when a scene starts or its
+    backdrop changes. Flip mode always pushes the whole frame, for comparison.
+    If overlay is set, it is called with the screen just before each present and
+    returns the rects it drew (e.g. the profiler's on-screen stats). Every callable in
+    after_present is called with the screen once the frame is out (e.g. frame capture).
+    """
+
+    def __init__(self, screen, mode=DIRTY_MODE, full_flip_ratio=0.5):
+        if mode not in (FLIP_MODE, DIRTY_MODE):
+            raise ValueError(f"Unknown render mode: {mode}")
+        self.screen = screen
+        self.mode = mode
+        self.screen_area = screen.get_width() * screen.get_height()
+        # Past this fraction of the screen one flip is cheaper than many small updates.
+        self.full_flip_area = int(self.screen_area * full_flip_ratio)
+        self.full_redraw = True
+        self._rects = []
+        self._previous = []
+        self.frames = 0
+        self.full_frames = 0
+        self.pixels_pushed = 0
+        self.overlay = None
+        self.after_present = []
+
+    def mark(self, rect):
+        self._rects.append(pygame.Rect(rect))
+
+    def mark_many(self, rects):
+        # e.g. the list of rects returned by Surface.blits()
+        self._rects.extend(rects)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def present(self):
+        self.frames += 1
+        if self.overlay is not None:
+            self._rects.extend(self.overlay(self.screen))
+        rects = self._previous + self._rects
+        area = sum(r.width * r.height for r in rects)
+        if self.mode == FLIP_MODE or self.full_redraw or area >= self.full_flip_area:
+            pygame.display.flip()
+            self.full_frames += 1
+            self.pixels_pushed += self.screen_area
+            self.full_redraw = False
+        else:
+            pygame.display.update(rects)
+            self.pixels_pushed += area
+        self._previous = self._rects
+        self._rects = []
+        for hook in self.after_present:
+            hook(self.screen)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "frames": self.frames,
+            "full_frames": self.full_frames,
+            "pixels_pushed": self.pixels_pushed,
+            "avg_pixels_per_frame": self.pixels_pushed / self.frames if self.frames else 0.0,
+        }
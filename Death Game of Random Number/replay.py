@@ -0,0 +1,322 @@
+import os
+import sys
+import mmap
+import json
+import time
+import zlib
+import queue
+import struct
+import argparse
+import threading
+import pygame
+
+# -------------------------
+# Replay File Format
+# -------------------------
+# <path>        header, then one fixed-width record per frame and per input event:
+#               a FRAME record (its game time in ms) followed by that frame's events.
+# <path>.snaps  header, then periodic state snapshots for seeking: (frame, byte offset
+#               of its FRAME record, RNG checksum, length) then the state as UTF-8 JSON.
+#               Replays get shared, so nothing in them is ever unpickled or run.
+MAGIC = b"DVLR"
+SNAPS_MAGIC = b"DVLS"
+VERSION = 2
+HEADER = struct.Struct("<4sHHQd")     # magic, version, record size, RNG seed, session start (epoch)
+RECORD = struct.Struct("<BBhhII")     # kind, button, x, y, key (or frame ms), unicode code point
+SNAPS_HEADER = struct.Struct("<4sH")  # magic, version
+SNAPSHOT = struct.Struct("<IQII")     # frame, offset, RNG checksum, JSON length
+
+FRAME, KEYDOWN, MOUSEBUTTONDOWN, QUIT = 0, 1, 2, 3
+
+def snapshot_path(path):
+    return path + ".snaps"
+
+def rng_check(rng_state):
+    # A checksum of random.getstate(), enough to notice a replay drifting off the recording.
+    return zlib.crc32(repr(rng_state).encode())
+
+class BufferedAppender:
+    """
+    Appends bytes to a file without ever writing on the caller's thread: data gathers in
+    memory and full buffers go to a writer thread. close() flushes the rest and waits.
+    """
+
+    def __init__(self, path, flush_bytes=64 * 1024):
+        self.file = open(path, "wb")
+        self.flush_bytes = flush_bytes
+        self.buffer = bytearray()
+        self.size = 0  # Bytes appended so far, i.e. the offset of the next append
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.writer, name="replay-writer", daemon=True)
+        self.thread.start()
+
+    def append(self, data):
+        self.buffer += data
+        self.size += len(data)
+        if len(self.buffer) >= self.flush_bytes:
+            self.queue.put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def writer(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            self.file.write(data)
+        self.file.close()
+
+    def close(self):
+        if self.buffer:
+            self.queue.put(bytes(self.buffer))
+            self.buffer.clear()
+        self.queue.put(None)
+        self.thread.join()
+
+# -------------------------
+# Frame Inputs (what SceneManager polls once per frame)
+# -------------------------
+IDLE_POLL_MS = 10  # How often a waiting LiveInput looks for input on the dummy video driver
+
+class LiveInput:
+    """The keyboard and mouse. frame_ms is the game time, fixed for the whole frame."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.frame = 0
+        self.frame_ms = 0
+
+    def now_ms(self):
+        return int((time.perf_counter() - self.start) * 1000)
+
+    def poll(self):
+        return self.next_frame(pygame.event.get())
+
+    def wait(self, until):
+        # Sleeps in the event queue until something arrives or game time reaches `until`
+        # (None: no time limit). pygame.event.wait() takes no CPU while it blocks, except
+        # on the dummy video driver (headless runs), where SDL waits by polling every
+        # millisecond; there the queue is checked every IDLE_POLL_MS instead.
+        if pygame.display.get_driver() == "dummy":
+            return self.next_frame(self.sleep_until(until))
+        if until is None:
+            first = pygame.event.wait()
+        else:
+            timeout = until - self.now_ms()
+            if timeout <= 0:
+                return self.poll()
+            first = pygame.event.wait(timeout)
+        events = pygame.event.get()
+        if first.type != pygame.NOEVENT:
+            events.insert(0, first)
+        return self.next_frame(events)
+
+    def sleep_until(self, until):
+        while True:
+            events = pygame.event.get()
+            if events:
+                return events
+            timeout = IDLE_POLL_MS if until is None else min(IDLE_POLL_MS, until - self.now_ms())
+            if timeout <= 0:
+                return events
+            time.sleep(timeout / 1000)
+
+    def next_frame(self, events):
+        self.frame_ms = self.now_ms()
+        self.frame += 1
+        return events
+
+    def close(self):
+        pass
+
+def encode_event(event):
+    if event.type == pygame.KEYDOWN:
+        char = event.unicode[:1] if isinstance(getattr(event, "unicode", ""), str) else ""
+        return RECORD.pack(KEYDOWN, 0, 0, 0, event.key & 0xFFFFFFFF, ord(char) if char else 0)
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        x, y = event.pos
+        return RECORD.pack(MOUSEBUTTONDOWN, event.button, x, y, 0, 0)
+    if event.type == pygame.QUIT:
+        return RECORD.pack(QUIT, 0, 0, 0, 0, 0)
+    return None  # Nothing any scene reads
+
+def decode_event(kind, button, x, y, key, char):
+    if kind == KEYDOWN:
+        return pygame.event.Event(pygame.KEYDOWN, key=key, unicode=chr(char) if char else "", mod=0, scancode=0)
+    if kind == MOUSEBUTTONDOWN:
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=button)
+    return pygame.event.Event(pygame.QUIT)
+
+class Recorder(LiveInput):
+    """
+    Live input that also logs every frame: its game time and the events scenes read.
+    Every snapshot_every frames it saves capture_state(), which must be plain JSON data,
+    so playback can seek, along with a checksum of capture_rng() to check playback against.
+    """
+
+    def __init__(self, path, seed, started, capture_state, capture_rng, snapshot_every=300):
+        super().__init__()
+        self.capture_state = capture_state
+        self.capture_rng = capture_rng
+        self.snapshot_every = snapshot_every
+        self.log = BufferedAppender(path)
+        self.snapshots = BufferedAppender(snapshot_path(path), flush_bytes=16 * 1024)
+        self.log.append(HEADER.pack(MAGIC, VERSION, RECORD.size, seed, started))
+        self.snapshots.append(SNAPS_HEADER.pack(SNAPS_MAGIC, VERSION))
+
+    def next_frame(self, events):
+        if self.frame % self.snapshot_every == 0:
+            state = json.dumps(self.capture_state(), separators=(",", ":")).encode()
+            check = rng_check(self.capture_rng())
+            self.snapshots.append(SNAPSHOT.pack(self.frame, self.log.size, check, len(state)) + state)
+        events = super().next_frame(events)
+        records = [RECORD.pack(FRAME, 0, 0, 0, self.frame_ms, 0)]
+        for event in events:
+            record = encode_event(event)
+            if record is not None:
+                records.append(record)
+        self.log.append(b"".join(records))
+        return events
+
+    def close(self):
+        self.log.close()
+        self.snapshots.close()
+
+class Player:
+    """
+    Feeds a recorded session back frame by frame from a memory-mapped log. The game
+    time of each frame comes from the log too, so scenes make the same decisions.
+    A real window close still stops playback. Past the last frame poll() returns QUIT.
+    At real speed each frame is held until its recorded time comes round, so idle
+    stretches of the recording (a few frames seconds apart) play back as long as they were.
+    """
+
+    def __init__(self, path, realtime=True):
+        with open(path, "rb") as log_file:
+            self.data = mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.seed, self.started = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        self.offset = HEADER.size
+        self.frame = 0
+        self.frame_ms = 0
+        self.fast_until = 0  # Frames before this play without waiting (seeking)
+        self.realtime = realtime
+        self.origin = None   # (wall clock, frame_ms) that real-speed playback counts from
+        self.snapshots = self.load_snapshots(snapshot_path(path))
+        self.checks = {}     # frame -> recorded RNG checksum, to catch a diverging replay
+        self.diverged_at = None
+
+    def load_snapshots(self, path):
+        snapshots = []
+        try:
+            with open(path, "rb") as snapshot_file:
+                data = snapshot_file.read()
+        except OSError:
+            return snapshots  # Without snapshots a seek replays from the start
+        if len(data) < SNAPS_HEADER.size or SNAPS_HEADER.unpack_from(data, 0) != (SNAPS_MAGIC, VERSION):
+            raise ValueError(f"{path} does not hold version {VERSION} snapshots")
+        position = SNAPS_HEADER.size
+        while position + SNAPSHOT.size <= len(data):
+            frame, offset, check, length = SNAPSHOT.unpack_from(data, position)
+            position += SNAPSHOT.size
+            snapshots.append((frame, offset, check, data[position:position + length]))
+            position += length
+        return snapshots
+
+    def seek(self, frame):
+        """
+        Jumps to the last snapshot at or before `frame` and returns its state as the plain
+        JSON data it was saved as (None when the replay starts from the beginning); frames
+        up to `frame` then play without waiting. Only that one snapshot is decoded.
+        """
+        self.fast_until = frame
+        best = None
+        for snapshot in self.snapshots:
+            if snapshot[0] <= frame:
+                best = snapshot
+        if best is None or best[0] == 0:
+            return None
+        self.frame, self.offset = best[0], best[1]
+        return json.loads(best[3])
+
+    def watch(self, capture_rng):
+        # When a frame that has a snapshot starts, compare the live RNG with the recorded
+        # checksum; the snapshots themselves stay undecoded.
+        for frame, _, check, _ in self.snapshots:
+            self.checks[frame] = check
+        self.capture_rng = capture_rng
+
+    def poll(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return [event]
+        if self.checks and self.frame in self.checks and self.diverged_at is None:
+            if rng_check(self.capture_rng()) != self.checks[self.frame]:
+                self.diverged_at = self.frame
+        data = self.data
+        if self.offset >= len(data):
+            return [pygame.event.Event(pygame.QUIT)]
+        kind, _, _, _, self.frame_ms, _ = RECORD.unpack_from(data, self.offset)
+        self.offset += RECORD.size
+        self.frame += 1
+        events = []
+        while self.offset < len(data) and data[self.offset] != FRAME:
+            events.append(decode_event(*RECORD.unpack_from(data, self.offset)))
+            self.offset += RECORD.size
+        if self.pace():
+            return [pygame.event.Event(pygame.QUIT)]
+        return events
+
+    def wait(self, until):
+        return self.poll()  # The recording already says when the next frame came
+
+    def pace(self):
+        # Holds the frame until its recorded time; True if the window was closed meanwhile.
+        if not self.realtime or self.frame < self.fast_until:
+            self.origin = None
+            return False
+        if self.origin is None:
+            self.origin = (time.perf_counter(), self.frame_ms)
+        due = self.origin[0] + (self.frame_ms - self.origin[1]) / 1000
+        while True:
+            delay = due - time.perf_counter()
+            if delay <= 0:
+                return False
+            event = pygame.event.wait(max(1, min(100, int(delay * 1000))))
+            if event.type == pygame.QUIT:
+                return True
+
+    def close(self):
+        self.data.close()
+
+class ReplayClock:
+    """Playback never waits on the frame rate: Player.poll() keeps to the recorded frame times."""
+
+    def tick(self, framerate=0):
+        return 0
+
+# -------------------------
+# Command Line: Inspect a Replay
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a replay recorded with py.py --record.")
+    parser.add_argument("replay")
+    args = parser.parse_args()
+
+    player = Player(args.replay)
+    frames = events = last_ms = 0
+    for offset in range(HEADER.size, len(player.data), RECORD.size):
+        kind, _, _, _, key, _ = RECORD.unpack_from(player.data, offset)
+        if kind == FRAME:
+            frames += 1
+            last_ms = key
+        else:
+            events += 1
+    print(f"seed {player.seed}, started {time.ctime(player.started)}")
+    print(f"{frames} frames ({last_ms / 1000:.1f} s of play), {events} input events, "
+          f"{os.path.getsize(args.replay)} bytes")
+    print(f"{len(player.snapshots)} snapshots, at frames {[snapshot[0] for snapshot in player.snapshots][:10]}")
+    player.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
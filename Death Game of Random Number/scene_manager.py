@@ -0,0 +1,181 @@
+import time
+import pygame
+from latency import NullLatency
+
+# -------------------------
+# Scenes and the One Frame Loop
+# -------------------------
+class Scene:
+    """
+    One screen of the game. The manager calls enter() when the scene becomes current,
+    then every frame handle(event) for each event, update() and render(), at `fps`
+    frames per second. exit() runs when the manager switches away or quits.
+    A scene moves on with self.manager.switch(next_scene) or ends the game with
+    self.manager.quit(). Either can be called from any hook.
+    `state` names the attributes that make up the scene's progress; snapshot() and
+    restore() save and put back exactly those (replay seeking).
+    A scene that only changes on input or at known times overrides next_change() and
+    sets self.dirty when update() changes what it shows; in idle mode the manager then
+    sleeps between changes instead of drawing the same frame `fps` times a second.
+    A scene whose input only shows up later sets defer_input and reports each input to
+    the latency tracker itself once it takes effect.
+    """
+
+    name = "scene"
+    fps = 30
+    state = ()
+    defer_input = False
+
+    def __init__(self):
+        self.manager = None
+        self.dirty = True
+
+    def next_change(self):
+        """
+        Game time (ms) at which the scene next changes without any input, None if only
+        input changes it, or 0 (the default) if it animates and draws every frame.
+        """
+        return 0
+
+    def enter(self):
+        pass
+
+    def handle(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def render(self):
+        pass
+
+    def exit(self):
+        pass
+
+    def snapshot(self):
+        return {name: getattr(self, name) for name in self.state}
+
+    def restore(self, saved):
+        for name, value in saved.items():
+            setattr(self, name, value)
+
+# Events that change what an idle scene shows; anything else (window focus, say)
+# wakes the loop for update() but draws nothing.
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+INPUT_KINDS = {pygame.KEYDOWN: "key", pygame.MOUSEBUTTONDOWN: "click"}  # Names in latency reports
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+
+class SceneManager:
+    """
+    Drives the current scene: events, update, render, present, then tick. This is the
+    one place that paces frames and times them for the profiler. A switch takes effect
+    before the old scene draws again, so no scene ever renders after handing over.
+    Each frame's events come from input.poll(): live input, a recorder or a replay.
+    With idle=True a scene that is not animating is not polled: input.wait() blocks
+    until an event arrives or the scene's next_change() comes round, and the frame is
+    drawn only if the scene is dirty.
+    Every key and click is handed to `latency` with the time it was received; its
+    shown() hook on the renderer times when the frame showing it goes out.
+    """
+
+    def __init__(self, renderer, clock, profiler, input, on_present=None, idle=False, latency=None):
+        self.renderer = renderer
+        self.clock = clock
+        self.profiler = profiler
+        self.input = input
+        self.on_present = on_present
+        self.idle = idle
+        self.latency = latency if latency is not None else NullLatency()
+        self.scene = None
+        self.next_scene = None
+        self.running = False
+        self.restore = None
+        self.frames = 0    # Loop iterations, i.e. wake-ups in idle mode
+        self.presents = 0  # Frames actually drawn
+
+    def switch(self, scene):
+        self.next_scene = scene
+
+    def quit(self):
+        self.running = False
+
+    def change_scene(self):
+        scene, self.next_scene = self.next_scene, None
+        if self.scene is not None:
+            self.scene.exit()
+        scene.manager = self
+        scene.dirty = True
+        self.scene = scene
+        scene.enter()
+        if self.restore is not None:
+            restore, self.restore = self.restore, None
+            restore(scene)
+
+    def pending(self):
+        return self.next_scene is not None or not self.running
+
+    def run(self, scene, restore=None):
+        # restore(scene), if given, runs once right after the first scene's enter(),
+        # e.g. to put back a replay snapshot.
+        self.restore = restore
+        self.switch(scene)
+        self.running = True
+        profiler = self.profiler
+        latency = self.latency
+        while self.running:
+            if self.next_scene is not None:
+                self.change_scene()
+                continue  # enter() may already have switched again
+            scene = self.scene
+            profiler.frame(scene.name)
+            self.frames += 1
+
+            # A dirty scene (one that just came up, say) draws before it sleeps; waiting
+            # first would keep the new screen off until the next input.
+            wake_at = scene.next_change() if self.idle and not scene.dirty else 0
+            if wake_at == 0:
+                events = self.input.poll()
+            else:
+                events = self.input.wait(wake_at)
+                profiler.mark("sleep")
+            received = time.perf_counter()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                else:
+                    scene.handle(event)
+                    if event.type in INPUT_EVENTS:
+                        scene.dirty = True
+                        if not scene.defer_input:
+                            latency.input(scene.name, INPUT_KINDS[event.type],
+                                          getattr(event, "posted_at", received))
+                    elif event.type in EXPOSE_EVENTS:
+                        scene.dirty = True
+                        self.renderer.invalidate()
+                if self.pending():
+                    break  # Events after a scene change belonged to the old scene
+            profiler.mark("events")
+            if self.pending():
+                continue
+
+            scene.update()
+            profiler.mark("update")
+            if self.pending():
+                continue
+            if wake_at != 0 and not scene.dirty:
+                continue  # Nothing changed on screen: straight back to waiting
+
+            scene.dirty = False
+            scene.render()
+            profiler.mark("render")
+            self.renderer.present()
+            profiler.mark("flip")
+            self.presents += 1
+            if self.on_present is not None:
+                self.on_present()
+
+            self.clock.tick(scene.fps)
+            profiler.mark("sleep")
+
+        if self.scene is not None:
+            self.scene.exit()
@@ -0,0 +1,49 @@
+import math
+import heapq
+import random
+
+# -------------------------
+# Random Event Scheduler
+# -------------------------
+def per_second_rate(chance, tick_rate):
+    """
+    Rate (per second) of the exponential waiting time that matches a per-tick chance at
+    tick_rate ticks per second: P(no event in one tick) stays 1 - chance.
+    """
+    if chance >= 1:
+        return math.inf
+    return -math.log1p(-chance) * tick_rate
+
+class EventScheduler:
+    """
+    Named events on a timer heap, in game-time milliseconds. A random trigger draws its
+    next firing time once, from the exponential distribution with the same expected rate
+    as rolling `chance` every tick. That replaces a random.random() call per frame, and
+    the timing no longer depends on the frame rate. next_deadline() says how long the
+    loop could sleep.
+    Draws use the global random module, so a seeded (or replayed) session fires the same.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.order = 0
+
+    def at(self, name, when):
+        self.order += 1
+        heapq.heappush(self.heap, (when, self.order, name))
+
+    def after_chance(self, name, now, chance, tick_rate):
+        rate = per_second_rate(chance, tick_rate)
+        delay = 0 if rate == math.inf else int(random.expovariate(rate) * 1000)
+        self.at(name, now + delay)
+
+    def due(self, now):
+        """Names of the events whose time has come, earliest first, removed from the heap."""
+        fired = []
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            fired.append(heapq.heappop(heap)[2])
+        return fired
+
+    def next_deadline(self):
+        return self.heap[0][0] if self.heap else None
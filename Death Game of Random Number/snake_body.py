@@ -0,0 +1,82 @@
+from array import array
+from collections import deque
+
+# -------------------------
+# Grid-Backed Snake Body
+# -------------------------
+identity_cache = {}  # cells -> array('i', range(cells)), copied by slicing for each new body
+
+def identity(cells):
+    template = identity_cache.get(cells)
+    if template is None:
+        template = identity_cache[cells] = array('i', range(cells))
+    return template[:]
+
+class SnakeBody:
+    """
+    Snake segments as cell indices (row * cols + col) on a cols x rows board.
+    The segments sit in a deque, oldest first. An occupancy count per cell makes
+    collision tests O(1). The free cells are kept in a dense array plus a position
+    index, so adding or removing a cell is a swap and a uniform random free cell is
+    one lookup.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        cells = cols * rows
+        self.segments = deque()
+        self.occupancy = array('H', bytes(2 * cells))  # Segments per cell (a still snake stacks up)
+        # free[:free_count] are the empty cells; free_pos[cell] is where cell sits in free.
+        self.free = identity(cells)
+        self.free_pos = identity(cells)
+        self.free_count = cells
+
+    def __len__(self):
+        return len(self.segments)
+
+    def push(self, cell):
+        self.segments.append(cell)
+        count = self.occupancy[cell] + 1
+        self.occupancy[cell] = count
+        if count == 1:
+            self.take_free(cell)
+
+    def pop_tail(self):
+        cell = self.segments.popleft()
+        count = self.occupancy[cell] - 1
+        self.occupancy[cell] = count
+        if count == 0:
+            self.give_free(cell)
+        return cell
+
+    def clear(self):
+        for cell in self.segments:
+            if self.occupancy[cell]:
+                self.occupancy[cell] = 0
+                self.give_free(cell)
+        self.segments.clear()
+
+    def random_free_cell(self, rng):
+        if self.free_count == 0:
+            return None
+        return self.free[rng.randrange(self.free_count)]
+
+    # -------------------------
+    # Free-cell index (swap with the boundary at free_count)
+    # -------------------------
+    def take_free(self, cell):
+        free, free_pos = self.free, self.free_pos
+        last = self.free_count - 1
+        i, other = free_pos[cell], free[last]
+        free[i], free[last] = other, cell
+        free_pos[other], free_pos[cell] = i, last
+        self.free_count = last
+
+    def give_free(self, cell):
+        free, free_pos = self.free, self.free_pos
+        first = self.free_count
+        i, other = free_pos[cell], free[first]
+        free[i], free[first] = other, cell
+        free_pos[other], free_pos[cell] = i, first
+        self.free_count = first + 1
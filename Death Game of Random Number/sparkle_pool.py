@@ -0,0 +1,78 @@
+import numpy as np
+
+# -------------------------
+# Pooled Sparkles (escape sequence)
+# -------------------------
+class SparklePool:
+    """
+    At most `capacity` sparkles, stored as parallel arrays (x, y, radius, speed) plus a
+    live mask. update() moves every sparkle up in one vectorized pass. A looping
+    sparkle (the scene's ambient ones) comes back in below the screen. Any other is
+    freed once it leaves the top, and the next spawn reuses its slot. spawn() refuses
+    when the pool is full and allow() rations spawns to `rate` a second (up to `burst`
+    at once), so the cost of a frame stays bounded however much the player clicks.
+    """
+
+    def __init__(self, capacity, height, rate, burst):
+        self.capacity = capacity
+        self.height = height
+        self.rate = rate
+        self.burst = burst
+        self.x = np.zeros(capacity, np.int32)
+        self.y = np.zeros(capacity, np.float64)
+        self.radius = np.zeros(capacity, np.int32)
+        self.speed = np.zeros(capacity, np.float64)  # 0 in free slots, so they never move
+        self.loops = np.zeros(capacity, bool)
+        self.live = np.zeros(capacity, bool)
+        self.free = list(range(capacity - 1, -1, -1))  # Free slots, lowest index on top
+        self.tokens = burst
+        self.tokens_at = None  # Game time (ms) the tokens were counted at
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def full(self):
+        return not self.free
+
+    def allow(self, now):
+        # Token bucket in game time, so a replay admits exactly the same spawns.
+        if self.tokens_at is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.tokens_at) * self.rate / 1000)
+        self.tokens_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def spawn(self, x, y, radius, speed, loops=False):
+        if not self.free:
+            return False
+        slot = self.free.pop()
+        self.x[slot] = x
+        self.y[slot] = y
+        self.radius[slot] = radius
+        self.speed[slot] = speed
+        self.loops[slot] = loops
+        self.live[slot] = True
+        return True
+
+    def update(self):
+        self.y -= self.speed
+        gone = self.live & (self.y + self.radius < 0)
+        if not gone.any():
+            return
+        wrap = gone & self.loops
+        self.y[wrap] = self.height + self.radius[wrap]
+        freed = np.flatnonzero(gone & ~self.loops)
+        self.live[freed] = False
+        self.speed[freed] = 0
+        self.free.extend(freed[::-1].tolist())
+
+    def blit_sequence(self, sprite):
+        """(surface, top-left) pairs for Surface.blits(); sprite(radius) gives the picture."""
+        slots = np.flatnonzero(self.live)
+        radius = self.radius[slots]
+        # int() of the old per-sparkle code truncated toward zero; astype does the same.
+        left = (self.x[slots] - radius).tolist()
+        top = (self.y[slots].astype(np.int32) - radius).tolist()
+        return [(sprite(r), (x, y)) for r, x, y in zip(radius.tolist(), left, top)]
@@ -0,0 +1,87 @@
+import random
+from array import array
+from collections import deque
+from datetime import datetime
+import numpy as np
+import pygame
+
+# -------------------------
+# Snapshot State as Plain JSON
+# -------------------------
+# Replays get shared, so loading one must never run code from it (pickle would).
+# to_plain() turns game state into JSON values. Lists, strings, numbers, booleans and
+# None stay as they are. Every other value becomes a one-key object that names its
+# kind, e.g. {"tuple": [...]} or {"object": "SnakeBody", "attributes": {...}}.
+# from_plain() only rebuilds objects whose class is in the `types` it is given. It
+# makes the instance without __init__ and sets the saved attributes on it.
+BIT_GENERATORS = {"PCG64": np.random.PCG64}  # What np.random.default_rng() uses
+
+def to_plain(value, types):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [to_plain(item, types) for item in value]
+    if isinstance(value, tuple):
+        return {"tuple": [to_plain(item, types) for item in value]}
+    if isinstance(value, deque):
+        return {"deque": [to_plain(item, types) for item in value], "maxlen": value.maxlen}
+    if isinstance(value, dict):
+        return {"dict": [[to_plain(key, types), to_plain(item, types)] for key, item in value.items()]}
+    if isinstance(value, array):
+        return {"array": value.typecode, "items": value.tolist()}
+    if isinstance(value, np.ndarray):
+        return {"ndarray": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, random.Random):
+        return {"random": to_plain(value.getstate(), types)}
+    if isinstance(value, np.random.Generator):
+        return {"generator": to_plain(value.bit_generator.state, types)}
+    if isinstance(value, pygame.Rect):
+        return {"rect": list(value)}
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if type(value) in types:
+        return {"object": type(value).__name__, "attributes": to_plain(vars(value), types)}
+    raise TypeError(f"Cannot snapshot a {type(value).__name__}")
+
+def from_plain(data, types):
+    if not isinstance(data, (list, dict)):
+        return data
+    if isinstance(data, list):
+        return [from_plain(item, types) for item in data]
+    if "tuple" in data:
+        return tuple(from_plain(item, types) for item in data["tuple"])
+    if "deque" in data:
+        return deque((from_plain(item, types) for item in data["deque"]), data["maxlen"])
+    if "dict" in data:
+        return {from_plain(key, types): from_plain(item, types) for key, item in data["dict"]}
+    if "array" in data:
+        return array(data["array"], data["items"])
+    if "ndarray" in data:
+        return np.array(data["ndarray"], dtype=np.dtype(data["dtype"]))
+    if "random" in data:
+        rng = random.Random()
+        rng.setstate(from_plain(data["random"], types))
+        return rng
+    if "generator" in data:
+        state = from_plain(data["generator"], types)
+        bit_generator = BIT_GENERATORS.get(state.get("bit_generator"))
+        if bit_generator is None:
+            raise ValueError(f"Unknown bit generator in snapshot: {state.get('bit_generator')!r}")
+        bits = bit_generator()
+        bits.state = state
+        return np.random.Generator(bits)
+    if "rect" in data:
+        return pygame.Rect(data["rect"])
+    if "datetime" in data:
+        return datetime.fromisoformat(data["datetime"])
+    if "object" in data:
+        by_name = {cls.__name__: cls for cls in types}
+        cls = by_name.get(data["object"])
+        if cls is None:
+            raise ValueError(f"Snapshot holds a {data['object']!r}, which is not game state")
+        instance = cls.__new__(cls)
+        instance.__dict__.update(from_plain(data["attributes"], types))
+        return instance
+    raise ValueError(f"Unknown value in snapshot: {sorted(data)}")
@@ -0,0 +1,219 @@
+import os
+import sys
+import glob
+import queue
+import struct
+import argparse
+import threading
+import time
+import numpy as np
+
+# -------------------------
+# Telemetry File Format
+# -------------------------
+# <dir>/telemetry.<seq>.bin: a header, then fixed-width records appended in batches.
+# A file is closed once it passes max_bytes and the next sequence number is opened;
+# files are never rewritten, so a collector can pick up closed ones at any time.
+MAGIC = b"DVLT"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")      # magic, version, record size
+RECORD = struct.Struct("<dQBBHii")   # wall time, play id, kind, code, count, value, ms into the play
+
+# Kinds, and what code / count / value hold for each
+PLAY_START = 0  # (a new player at the warning screen)
+GUESS      = 1  # code: outcome (OUTCOMES), count: attempts used, value: the guess
+HARD_TIME  = 2  # (Hard Time chosen)
+DEMON_END  = 3  # code: DEMON_WON or DEMON_LOST, count: lives left, value: score
+ENDING     = 4  # code: ENDINGS, count: attempts used
+HINT       = 5  # (the glitch hint showed)
+DRAGON     = 6  # (the dragon flew)
+DROPPED    = 7  # value: records dropped since the last DROPPED record (queue was full)
+
+KIND_NAMES = ("play_start", "guess", "hard_time", "demon_end", "ending", "hint", "dragon", "dropped")
+OUTCOMES = {"playing": 0, "hell": 1, "game_over": 2}
+ENDINGS = {"hell": 1, "escape": 2, "game_over": 3}
+DEMON_WON, DEMON_LOST = 1, 2
+
+class NullTelemetry:
+    """What the game uses when telemetry is off: every call is an empty method."""
+
+    enabled = False
+
+    def start_play(self, ms):
+        pass
+
+    def record(self, kind, ms, code=0, count=0, value=0):
+        pass
+
+    def close(self):
+        pass
+
+class Telemetry:
+    """
+    Records go into a bounded queue with put_nowait(), so the frame loop never waits
+    on the disk. When the queue is full the record is dropped and counted instead.
+    A writer thread drains the queue in batches and appends them to size-rotated files;
+    close() (registered with atexit, so sys.exit() runs it) writes whatever is left.
+    """
+
+    enabled = True
+
+    def __init__(self, directory, max_bytes=4 * 1024 * 1024, queue_size=4096, batch=256):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.batch = batch
+        self.queue = queue.Queue(queue_size)
+        self.play = 0
+        self.play_started = 0   # Game time (ms) the current play started at
+        self.dropped = 0        # Records dropped so far (queue full)
+        self.dropped_noted = 0  # ...of which a DROPPED record has been written
+        self.written = 0
+        self.sequence = max((file_sequence(path) for path in telemetry_files(directory)), default=0)
+        self.file = None
+        self.thread = threading.Thread(target=self.writer, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    def start_play(self, ms):
+        # Plays are told apart by a random id; os.urandom leaves the game's RNG alone.
+        self.play = int.from_bytes(os.urandom(8), "little")
+        self.play_started = ms
+        self.record(PLAY_START, ms)
+
+    def record(self, kind, ms, code=0, count=0, value=0):
+        # ms is game time; the record keeps how far into the play it was. A value past
+        # int32 (a very long typed guess) is clamped to fit.
+        value = max(-2 ** 31, min(2 ** 31 - 1, value))
+        try:
+            record = RECORD.pack(time.time(), self.play, kind, code, count, value, ms - self.play_started)
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def writer(self):
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = records[-1] is None
+            if closing:
+                records.pop()
+            if self.dropped > self.dropped_noted:
+                dropped = self.dropped - self.dropped_noted
+                self.dropped_noted += dropped
+                records.append(RECORD.pack(time.time(), self.play, DROPPED, 0, 0, dropped, 0))
+            if records:
+                self.append(b"".join(records), len(records))
+            if closing:
+                if self.file is not None:
+                    self.file.close()
+                return
+
+    def append(self, data, count):
+        if self.file is None or self.file.tell() >= self.max_bytes:
+            if self.file is not None:
+                self.file.close()
+            self.sequence += 1
+            path = os.path.join(self.directory, f"telemetry.{self.sequence:06d}.bin")
+            self.file = open(path, "wb")
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.file.write(data)
+        self.file.flush()
+        self.written += count
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)  # Blocks only if the queue is full; the writer is draining it
+            self.thread.join()
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "queued": self.queue.qsize()}
+
+def telemetry_from_env():
+    """DEVIL_TELEMETRY=<directory> turns telemetry on and writes its files there."""
+    directory = os.environ.get("DEVIL_TELEMETRY", "")
+    if directory in ("", "0"):
+        return NullTelemetry()
+    return Telemetry(directory)
+
+def telemetry_files(directory):
+    return sorted(glob.glob(os.path.join(directory, "telemetry.*.bin")))
+
+def file_sequence(path):
+    try:
+        return int(os.path.basename(path).split(".")[1])
+    except (IndexError, ValueError):
+        return 0
+
+# -------------------------
+# Command Line: Aggregate Telemetry Files
+# -------------------------
+def load_records(paths):
+    # All records of all files as one NumPy structured array; each file is one read.
+    dtype = np.dtype([("time", "<f8"), ("play", "<u8"), ("kind", "u1"), ("code", "u1"),
+                      ("count", "<u2"), ("value", "<i4"), ("ms", "<i4")])
+    assert dtype.itemsize == RECORD.size
+    arrays = []
+    for path in paths:
+        with open(path, "rb") as telemetry_file:
+            magic, version, record_size = HEADER.unpack(telemetry_file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                print(f"Skipping {path}: not version {VERSION} telemetry")
+                continue
+            data = telemetry_file.read()
+        usable = len(data) - len(data) % RECORD.size  # A file cut off mid-record keeps the rest
+        arrays.append(np.frombuffer(data[:usable], dtype))
+    return np.concatenate(arrays) if arrays else np.zeros(0, dtype)
+
+def summarize(records):
+    kinds = records["kind"]
+    plays = np.unique(records["play"][kinds == PLAY_START])
+    print(f"{len(records)} records, {len(plays)} plays")
+
+    endings = records[kinds == ENDING]
+    names = {code: name for name, code in ENDINGS.items()}
+    for code in sorted(names):
+        ended = endings[endings["code"] == code]
+        if len(ended):
+            print(f"  ending {names[code]:<10} {len(ended):>7}  mean attempts used {ended['count'].mean():.1f}")
+
+    guesses = records[kinds == GUESS]
+    if len(guesses):
+        per_play = np.unique(guesses["play"], return_counts=True)[1]
+        print(f"  guesses: {len(guesses)}, {per_play.mean():.1f} per guessing play")
+
+    hard_time = np.unique(records["play"][kinds == HARD_TIME])
+    if len(plays):
+        print(f"  Hard Time chosen in {len(hard_time)} plays ({len(hard_time) / len(plays) * 100:.1f}%)")
+    demon = records[kinds == DEMON_END]
+    if len(demon):
+        won = demon["code"] == DEMON_WON
+        print(f"  Hard Time won {won.sum()} / lost {(~won).sum()}, score mean {demon['value'].mean():.0f} "
+              f"max {demon['value'].max()}, lives left mean {demon['count'].mean():.2f}")
+
+    for kind in (HINT, DRAGON):
+        fired = records[kinds == kind]
+        if len(fired):
+            print(f"  {KIND_NAMES[kind]:<6} fired {len(fired)} times, p50 "
+                  f"{np.median(fired['ms']) / 1000:.1f} s into the play")
+    print(f"  dropped records: {int(records['value'][kinds == DROPPED].sum())}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate telemetry written with DEVIL_TELEMETRY=<dir>.")
+    parser.add_argument("paths", nargs="+", help="telemetry directories or files")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.paths:
+        paths.extend(telemetry_files(path) if os.path.isdir(path) else [path])
+    start = time.perf_counter()
+    records = load_records(paths)
+    loaded = time.perf_counter() - start
+    print(f"{len(paths)} files read in {loaded * 1000:.0f} ms")
+    summarize(records)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import os
+import json
+import pygame
+from collections import OrderedDict
+
+# -------------------------
+# System Font Path Cache (on disk)
+# -------------------------
+def default_font_cache_file():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "devils_game", "fonts.json")
+
+class FontPathCache:
+    """
+    Remembers which file each system font name resolved to, across runs.
+    Resolving a name through pygame scans every installed font (fc-list on Linux, the
+    registry on Windows). With this cache a relaunch only checks that the file exists.
+    Names that match no font are only remembered for this run, so a font installed
+    later is found on the next launch.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_font_cache_file()
+        self.paths = None
+        self.missing = set()  # Faces with no font file, looked up this run
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                self.paths = json.load(cache_file)
+        except (OSError, ValueError):
+            self.paths = {}
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as cache_file:
+                json.dump(self.paths, cache_file)
+        except OSError:
+            pass  # A read-only home just means scanning again next run
+
+    def resolve(self, face):
+        # Font file for face, or None for pygame's default font (what SysFont falls back to).
+        if self.paths is None:
+            self.load()
+        if face in self.missing:
+            return None
+        path = self.paths.get(face)
+        if path is not None and os.path.exists(path):
+            return path
+        path = pygame.font.match_font(face)
+        if path is None:
+            self.missing.add(face)
+            if face in self.paths:
+                del self.paths[face]  # A miss stored by an older version, or a font since removed
+                self.save()
+            return None
+        self.paths[face] = path
+        self.save()
+        return path
+
+# -------------------------
+# Text Surface Cache
+# -------------------------
+class TextCache:
+    """
+    Shared LRU cache of rendered text surfaces and the font objects that made them.
+    Surfaces are keyed by (face, size, text, color, antialias); a face of None means
+    pygame's default font, anything else is a system font name found via font_paths.
+    """
+
+    def __init__(self, maxsize=512, font_paths=None):
+        self.maxsize = maxsize
+        self.font_paths = font_paths or FontPathCache()
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+        self._fonts = {}
+
+    def font(self, face, size):
+        key = (face, size)
+        cached_font = self._fonts.get(key)
+        if cached_font is None:
+            path = None if face is None else self.font_paths.resolve(face)
+            cached_font = pygame.font.Font(path, size)
+            self._fonts[key] = cached_font
+        return cached_font
+
+    def render(self, face, size, text, color, antialias=True):
+        key = (face, size, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.font(face, size).render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def prebake(self, face, sizes, text, color, antialias=True):
+        # Returns {size: surface} so the caller keeps the frames even if the LRU evicts them.
+        return {size: self.render(face, size, text, color, antialias) for size in sizes}
+
+    def clear(self):
+        self._surfaces.clear()
+        self._fonts.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "surfaces": len(self._surfaces),
+            "fonts": len(self._fonts),
+        }